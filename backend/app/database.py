@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import binascii
 import hashlib
 import hmac
 import json
 import os
+import struct
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from contextlib import contextmanager
 import logging
@@ -21,6 +23,7 @@ from typing import (
     Literal,
 )
 import uuid
+import asyncpg
 from aglib import Response  # type: ignore[attr-defined]
 from psycopg import errors, sql, OperationalError, InterfaceError
 from contextlib import asynccontextmanager
@@ -66,6 +69,10 @@ CHUNK_COLUMN_SOURCES: dict[str, str] = {
     "source_site": "i.source_site",
 }
 
+HNSW_DEFAULT_EF_SEARCH = 40  # pgvector default
+HNSW_MAX_EF_SEARCH = 1000  # pgvector upper bound
+HNSW_ITERATIVE_SCAN_MIN_VERSION = (0, 8)  # first pgvector with hnsw.iterative_scan
+
 CHUNK_SEARCH_DEFAULT_COLUMNS: tuple[str, ...] = (
     "id",
     "item_id",
@@ -91,25 +98,104 @@ DATABASE_URL = os.getenv(
 )
 pool: AsyncConnectionPool | None = None
 
+# Connection budget per process, shared by the psycopg pool and the search pool
+DB_MAX_CONNECTIONS = 20
+
+# Read-only search queries run on a separate asyncpg pool: binary protocol
+# and a binary pgvector codec. The pool is opened on first use (after
+# init_database has created the vector extension) and holds no idle
+# connections. Prepared statements are off by default, matching the
+# psycopg pool's prepare_threshold=None; set SEARCH_STATEMENT_CACHE_SIZE
+# to enable asyncpg's statement cache on a direct connection.
+SEARCH_POOL_MIN_SIZE = 0
+SEARCH_POOL_MAX_SIZE = 5
+SEARCH_POOL_MAX_QUERIES = 50_000
+SEARCH_STATEMENT_CACHE_SIZE = int(os.getenv("SEARCH_STATEMENT_CACHE_SIZE", "0"))
+search_pool: asyncpg.Pool | None = None
+_search_pool_lock: asyncio.Lock | None = None
+# Set when the search pool opens, from the installed pgvector version
+_hnsw_iterative_scan = False
+
+
+def _encode_vector(vec: Sequence[float]) -> bytes:
+    """Encode a vector in pgvector's binary format (dim, unused, float4s)."""
+    return struct.pack(f">HH{len(vec)}f", len(vec), 0, *vec)
+
+
+def _decode_vector(data: bytes) -> list[float]:
+    """Decode pgvector's binary format into a list of floats."""
+    dim, _ = struct.unpack_from(">HH", data)
+    return list(struct.unpack_from(f">{dim}f", data, 4))
+
+
+def _parse_version(version: str | None) -> tuple[int, ...]:
+    """Parse an extension version such as "0.8.0" into a comparable tuple."""
+    parts = []
+    for part in (version or "").split("."):
+        if not part.isdigit():
+            break
+        parts.append(int(part))
+    return tuple(parts)
+
+
+async def _init_search_connection(conn: asyncpg.Connection) -> None:
+    await conn.set_type_codec(
+        "vector",
+        schema="public",
+        encoder=_encode_vector,
+        decoder=_decode_vector,
+        format="binary",
+    )
+
 
 async def init_pool():
-    global pool
+    global pool, _search_pool_lock
     if pool is None:
         pool = AsyncConnectionPool(
             conninfo=DATABASE_URL,
-            min_size=1, max_size=20,
+            min_size=1, max_size=DB_MAX_CONNECTIONS - SEARCH_POOL_MAX_SIZE,
             kwargs={"row_factory": dict_row,
                 "prepare_threshold": None},
             timeout=10, max_lifetime=1800, max_idle=300,
             open=False
         )
         await pool.open()
+    # Created here so it binds to the loop that owns the pools
+    _search_pool_lock = asyncio.Lock()
+
+async def _open_search_pool() -> asyncpg.Pool:
+    """Open the search pool on first use; the vector codec needs the extension."""
+    global search_pool, _hnsw_iterative_scan
+    assert _search_pool_lock is not None, "init_pool() has not been called"
+    async with _search_pool_lock:
+        if search_pool is None:
+            opened = await asyncpg.create_pool(
+                DATABASE_URL,
+                min_size=SEARCH_POOL_MIN_SIZE,
+                max_size=SEARCH_POOL_MAX_SIZE,
+                max_queries=SEARCH_POOL_MAX_QUERIES,
+                max_inactive_connection_lifetime=300,
+                statement_cache_size=SEARCH_STATEMENT_CACHE_SIZE,
+                init=_init_search_connection,
+            )
+            extversion = await opened.fetchval(
+                "SELECT extversion FROM pg_extension WHERE extname = 'vector'"
+            )
+            # Older pgvector rejects unknown hnsw.* settings, so only set it when supported
+            _hnsw_iterative_scan = _parse_version(extversion) >= HNSW_ITERATIVE_SCAN_MIN_VERSION
+            search_pool = opened
+    return search_pool
 
 async def close_pool():
-    global pool
+    global pool, search_pool, _search_pool_lock, _hnsw_iterative_scan
     if pool:
         await pool.close()
         pool = None
+    if search_pool:
+        await search_pool.close()
+        search_pool = None
+    _search_pool_lock = None
+    _hnsw_iterative_scan = False
 
 @asynccontextmanager
 async def get_connection():
@@ -117,6 +203,12 @@ async def get_connection():
     async with pool.connection() as conn:
         yield conn
 
+@asynccontextmanager
+async def get_search_connection():
+    search = search_pool if search_pool is not None else await _open_search_pool()
+    async with search.acquire() as conn:
+        yield conn
+
 
 # === INITIALISATION ===
 
@@ -386,6 +478,52 @@ async def create_item(payload: dict[str, Any]) -> dict[str, Any]:
     return _normalise_row(row)
 
 
+async def create_items_bulk(payloads: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Persist several items in one pipelined batch, returning the created rows in order.
+
+    All payloads must share the same columns.
+    """
+
+    if not payloads:
+        return []
+
+    columns = list(payloads[0].keys())
+    for payload in payloads:
+        if not payload.get("user_id"):
+            raise ValueError("Item must belong to a user")
+        if payload.keys() != payloads[0].keys():
+            raise ValueError("All item payloads must share the same columns")
+
+    column_identifiers = [sql.Identifier(col) for col in columns]
+    value_placeholders = [sql.Placeholder(col) for col in columns]
+
+    query = sql.SQL("INSERT INTO items ({}) VALUES ({}) RETURNING id").format(
+        sql.SQL(", ").join(column_identifiers),
+        sql.SQL(", ").join(value_placeholders)
+    )
+
+    rows: list[dict[str, Any]] = []
+    async with get_connection() as conn:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            try:
+                await cur.executemany(query, payloads, returning=True)
+            except errors.ForeignKeyViolation as exc:
+                await conn.rollback()
+                raise ValueError("User does not exist") from exc
+
+            # One result set per inserted row
+            while True:
+                row = await cur.fetchone()
+                if not row:
+                    await conn.rollback()
+                    raise RuntimeError("Failed to insert item")
+                rows.append(_normalise_row(row))
+                if not cur.nextset():
+                    break
+        await conn.commit()
+    return rows
+
+
 async def get_item(item_id: str, cols: list[str], user_id: str) -> dict[str, Any] | None:
     """Return dict of cols for an item by id ensuring ownership."""
     safe_cols = [col for col in cols if col in schemas.ITEM_PUBLIC_COLS]
@@ -602,27 +740,25 @@ async def delete_item(item_id: str, user_id: str) -> bool:
     return deleted
 
 
-async def lexical_search_items(*, user_id: str, query_text: str, columns: Sequence[str] | None = None, limit: int = 10) -> list[dict[str, Any]]:
+async def lexical_search_items(*, user_id: str, query_text: str, columns: Sequence[str] | None = None, limit: int = 10, exclude_ids: Sequence[str] | None = None) -> list[dict[str, Any]]:
     if limit <= 0:
         raise ValueError("Limit must be positive")
     safe_columns = _ensure_columns(columns, schemas.ITEM_PUBLIC_COLS, ITEM_SEARCH_DEFAULT_COLUMNS)
     column_select = ", ".join(f"i.{col}" for col in safe_columns)
     if column_select:
         column_select = column_select + ", "
-    params: dict[str, Any] = {"user_id": user_id, "limit": limit, "query": query_text.strip()}
     query = f"""
         SELECT {column_select}
-               ts_rank(i.ts_embedding, plainto_tsquery('english', %(query)s)) AS score
+               ts_rank(i.ts_embedding, plainto_tsquery('english', $1)) AS score
         FROM items AS i
-        WHERE i.user_id = %(user_id)s
-          AND i.ts_embedding @@ plainto_tsquery('english', %(query)s)
+        WHERE i.user_id = $2
+          AND i.ts_embedding @@ plainto_tsquery('english', $1)
+          AND i.id <> ALL($4::uuid[])
         ORDER BY score DESC
-        LIMIT %(limit)s
+        LIMIT $3
     """
-    async with get_connection() as conn:
-        async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(query, params)
-            rows = await cur.fetchall()
+    async with get_search_connection() as conn:
+        rows = await conn.fetch(query, query_text.strip(), user_id, limit, list(exclude_ids or ()))
     return [_normalise_row(row) for row in rows]
 
 
@@ -633,29 +769,26 @@ async def semantic_search_items(*, user_id: str, query_vector: Sequence[float],
     column_select = ", ".join(f"i.{col}" for col in safe_columns)
     if column_select:
         column_select = column_select + ", "
-    params: dict[str, Any] = {"user_id": user_id, "limit": limit, "query_vec": _vector_to_pg(query_vector)}
-    distance_expr = "i.mistral_embedding <-> %(query_vec)s::vector"
+    distance_expr = "i.mistral_embedding <-> $1::vector"
     query = f"""
         SELECT {column_select}
                {distance_expr} AS distance,
                1.0 / (1.0 + ({distance_expr})::float) AS score
         FROM items AS i
-        WHERE i.user_id = %(user_id)s
+        WHERE i.user_id = $2
           AND i.mistral_embedding IS NOT NULL
         ORDER BY {distance_expr} ASC
-        LIMIT %(limit)s
+        LIMIT $3
     """
-    async with get_connection() as conn:
-        async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(query, params)
-            rows = await cur.fetchall()
+    async with get_search_connection() as conn:
+        rows = await conn.fetch(query, query_vector, user_id, limit)
     return [_normalise_row(row) for row in rows]
 
 
 # === CHUNKS ===
 
 
-async def lexical_search_chunks(*, user_id: str, query_text: str, columns: Sequence[str] | None = None, limit: int = 10) -> list[dict[str, Any]]:
+async def lexical_search_chunks(*, user_id: str, query_text: str, columns: Sequence[str] | None = None, limit: int = 10, exclude_ids: Sequence[str] | None = None) -> list[dict[str, Any]]:
     if limit <= 0:
         raise ValueError("Limit must be positive")
     allowed_chunk_columns = tuple(CHUNK_COLUMN_SOURCES.keys())
@@ -664,21 +797,19 @@ async def lexical_search_chunks(*, user_id: str, query_text: str, columns: Seque
     column_select = ", ".join(select_parts)
     if column_select:
         column_select = column_select + ", "
-    params: dict[str, Any] = {"user_id": user_id, "limit": limit, "query": query_text.strip()}
     query = f"""
         SELECT {column_select}
-               ts_rank(c.ts_embedding, plainto_tsquery('english', %(query)s)) AS score
+               ts_rank(c.ts_embedding, plainto_tsquery('english', $1)) AS score
         FROM item_chunks AS c
         JOIN items AS i ON i.id = c.item_id
-        WHERE i.user_id = %(user_id)s
-          AND c.ts_embedding @@ plainto_tsquery('english', %(query)s)
+        WHERE i.user_id = $2
+          AND c.ts_embedding @@ plainto_tsquery('english', $1)
+          AND c.item_id <> ALL($4::uuid[])
         ORDER BY score DESC
-        LIMIT %(limit)s
+        LIMIT $3
     """
-    async with get_connection() as conn:
-        async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(query, params)
-            rows = await cur.fetchall()
+    async with get_search_connection() as conn:
+        rows = await conn.fetch(query, query_text.strip(), user_id, limit, list(exclude_ids or ()))
     return [_normalise_row(row) for row in rows]
 
 
@@ -691,23 +822,75 @@ async def semantic_search_chunks(*, user_id: str, query_vector: Sequence[float],
     column_select = ", ".join(select_parts)
     if column_select:
         column_select = column_select + ", "
-    params: dict[str, Any] = {"user_id": user_id, "limit": limit, "query_vec": _vector_to_pg(query_vector)}
-    distance_expr = "c.mistral_embedding <-> %(query_vec)s::vector"
+    distance_expr = "c.mistral_embedding <-> $1::vector"
     query = f"""
         SELECT {column_select}
                {distance_expr} AS distance,
                1.0 / (1.0 + ({distance_expr})::float) AS score
         FROM item_chunks AS c
         JOIN items AS i ON i.id = c.item_id
-        WHERE i.user_id = %(user_id)s
+        WHERE i.user_id = $2
           AND c.mistral_embedding IS NOT NULL
         ORDER BY {distance_expr} ASC
-        LIMIT %(limit)s
+        LIMIT $3
     """
-    async with get_connection() as conn:
-        async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(query, params)
-            rows = await cur.fetchall()
+    async with get_search_connection() as conn:
+        rows = await conn.fetch(query, query_vector, user_id, limit)
+    return [_normalise_row(row) for row in rows]
+
+
+async def semantic_search_best_chunk_per_item(*, user_id: str, query_vector: Sequence[float], limit: int = 10, min_score: float = 0.0, ef_search: int = HNSW_DEFAULT_EF_SEARCH) -> list[dict[str, Any]]:
+    """Return the closest chunk per item as item rows with a chunk preview.
+
+    Candidate chunks are the user's `ef_search` nearest chunks from the HNSW
+    index. The `user_id` filter is applied after the index scan, so on
+    pgvector >= 0.8 the scan runs with iterative scan (`hnsw.iterative_scan`)
+    and keeps walking the graph until enough of this user's chunks are
+    found, up to `hnsw.max_scan_tuples`. On older versions a single scan
+    yields about `ef_search` chunks across all users.
+    """
+    if limit <= 0:
+        raise ValueError("Limit must be positive")
+    ef_search = min(max(ef_search, limit), HNSW_MAX_EF_SEARCH)
+    # score = 1 / (1 + distance), so a minimum score is a maximum distance
+    max_distance = (1.0 / min_score - 1.0) if min_score > 0 else float("inf")
+    distance_expr = "c.mistral_embedding <-> $1::vector"
+    query = f"""
+        WITH nearest AS (
+            SELECT c.item_id,
+                   c.content_text,
+                   ({distance_expr})::float AS distance
+            FROM item_chunks AS c
+            JOIN items AS i ON i.id = c.item_id
+            WHERE i.user_id = $2
+              AND c.mistral_embedding IS NOT NULL
+            ORDER BY {distance_expr} ASC
+            LIMIT $5
+        )
+        SELECT best.item_id AS id,
+               best.content_text AS preview,
+               i.title,
+               i.summary,
+               i.url,
+               best.distance,
+               1.0 / (1.0 + best.distance) AS score
+        FROM (
+            SELECT DISTINCT ON (item_id) item_id, content_text, distance
+            FROM nearest
+            WHERE distance <= $3
+            ORDER BY item_id, distance ASC
+        ) AS best
+        JOIN items AS i ON i.id = best.item_id
+        ORDER BY best.distance ASC
+        LIMIT $4
+    """
+    async with get_search_connection() as conn:
+        async with conn.transaction():
+            settings = "set_config('hnsw.ef_search', $1, true)"
+            if _hnsw_iterative_scan:
+                settings += ", set_config('hnsw.iterative_scan', 'strict_order', true)"
+            await conn.execute(f"SELECT {settings}", str(ef_search))
+            rows = await conn.fetch(query, query_vector, user_id, max_distance, limit, ef_search)
     return [_normalise_row(row) for row in rows]
 
 
@@ -860,7 +1043,7 @@ async def create_usage_log(
 # === UTILITIES ===
 
 
-def _normalise_row(row: dict[str, Any]) -> dict[str, Any]:
+def _normalise_row(row: Mapping[str, Any]) -> dict[str, Any]:
     """Transform database row values into JSON-serialisable primitives."""
 
     result: dict[str, Any] = {}
@@ -968,17 +1151,20 @@ async def update_user_control(user_id: str, page_path: str, control_key: str, co
 
 __all__ = [
     "get_connection",
+    "get_search_connection",
     "close_pool",
     "init_database",
     "create_user",
     "authenticate_user",
     "create_item",
+    "create_items_bulk",
     "get_item",
     "get_items",
     "lexical_search_items",
     "semantic_search_items",
     "lexical_search_chunks",
     "semantic_search_chunks",
+    "semantic_search_best_chunk_per_item",
     "update_item",
     "delete_item",
     "add_item_chunks",
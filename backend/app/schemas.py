@@ -206,7 +206,11 @@ INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_items_ts_embedding ON items USING GIN (ts_embedding)",
     "CREATE INDEX IF NOT EXISTS idx_items_mistral_embedding_ivfflat ON items USING ivfflat (mistral_embedding vector_cosine_ops) WITH (lists = 100)",
     "CREATE INDEX IF NOT EXISTS idx_item_chunks_ts_embedding ON item_chunks USING GIN (ts_embedding)",
-    "CREATE INDEX IF NOT EXISTS idx_item_chunks_mistral_embedding_ivfflat ON item_chunks USING ivfflat (mistral_embedding vector_l2_ops) WITH (lists = 100)",
+    # HNSW builds are slower than ivfflat and this plain CREATE INDEX blocks
+    # writes to item_chunks while it runs at startup. On a large existing table,
+    # build it beforehand with CREATE INDEX CONCURRENTLY (same name) so this
+    # statement is a no-op.
+    "CREATE INDEX IF NOT EXISTS idx_item_chunks_mistral_embedding_hnsw ON item_chunks USING hnsw (mistral_embedding vector_l2_ops)",
     "CREATE INDEX IF NOT EXISTS idx_llm_usage_logs_user_created_at ON llm_usage_logs(user_id, created_at DESC)",
     "CREATE UNIQUE INDEX IF NOT EXISTS idx_items_user_url_unique ON items(user_id, url)",
     "CREATE UNIQUE INDEX IF NOT EXISTS idx_items_user_canonical_url ON items(user_id, canonical_url) WHERE canonical_url IS NOT NULL",
@@ -221,6 +225,11 @@ INDEXES = [
 COLUMN_ADDITIONS = [
 ]
 
+INDEX_MIGRATIONS = [
+    # Chunk ANN search moved from ivfflat to hnsw (recall tuned via hnsw.ef_search)
+    "DROP INDEX IF EXISTS idx_item_chunks_mistral_embedding_ivfflat",
+]
+
 
 # === FULL SCHEMA ===
 
@@ -254,7 +263,8 @@ def get_create_sql() -> list[str]:
     if COLUMN_ADDITIONS:
         statements.extend(COLUMN_ADDITIONS)
 
-    # Indexes last
+    # Index replacements (for migrations), then indexes last
+    statements.extend(INDEX_MIGRATIONS)
     statements.extend(INDEXES)
 
     return statements
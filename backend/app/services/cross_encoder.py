@@ -11,6 +11,7 @@ from typing import Any, Sequence
 from functools import lru_cache
 
 import cohere
+import numpy as np
 # from sentence_transformers import CrossEncoder
 
 from aglib import Response
@@ -27,6 +28,7 @@ COHERE_RERANK_MODEL = "rerank-english-v3.0"  # Free tier available
 CROSS_ENCODER_MODEL = COHERE_RERANK_MODEL
 CROSS_ENCODER_THRESHOLD = 0.3
 MAX_BATCH_SIZE = 100  # Cohere supports larger batches
+MAX_DOCUMENT_CHARS = 1000  # Truncate documents to stay within rerank token limits
 # CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-TinyBERT-L-2-v2"
 # _cross_encoder_model = None
 
@@ -147,7 +149,7 @@ async def _log_usage(
 #     return pairs
 
 
-def _prepare_documents(candidates: Sequence[dict[str, Any]]) -> list[str]:
+def prepare_documents(candidates: Sequence[dict[str, Any]]) -> list[str]:
     """Prepare candidate documents for Cohere reranking."""
     documents = []
 
@@ -168,42 +170,36 @@ def _prepare_documents(candidates: Sequence[dict[str, Any]]) -> list[str]:
             candidate_parts.append(candidate["content_text"])
 
         # Join parts with space, limit length to avoid token limits
-        candidate_text = " ".join(candidate_parts)[:1000]
+        candidate_text = " ".join(candidate_parts)[:MAX_DOCUMENT_CHARS]
         documents.append(candidate_text if candidate_text.strip() else " ")
 
     return documents
 
 
-async def score_relevance(
+async def score_texts(
     query: str,
-    candidates: Sequence[dict[str, Any]],
+    documents: Sequence[str],
     *,
     user_id: str | None = None,
-    usage_operation: str = "cross_encoder.score_relevance",
-) -> list[float]:
-    """Score relevance between query and candidates using Cohere rerank API.
+    usage_operation: str = "cross_encoder.score_texts",
+) -> np.ndarray:
+    """Score prepared documents against the query using Cohere rerank API.
 
-    Returns scores in same order as input candidates.
+    Returns a float array aligned with the input documents.
     Higher scores indicate better relevance.
     """
-    if not candidates:
-        return []
-
-    if not query.strip():
-        return [0.0] * len(candidates)
+    if not documents or not query.strip():
+        return np.zeros(len(documents), dtype=np.float64)
 
     try:
-        # Prepare documents for Cohere
-        documents = _prepare_documents(candidates)
-
         # Get Cohere client
         client = _get_cohere_client()
 
         # Score in batches to respect API limits
-        all_scores = [0.0] * len(documents)
+        all_scores = np.zeros(len(documents), dtype=np.float64)
 
         for i in range(0, len(documents), MAX_BATCH_SIZE):
-            batch_docs = documents[i:i + MAX_BATCH_SIZE]
+            batch_docs = list(documents[i:i + MAX_BATCH_SIZE])
 
             # Run rerank in thread to avoid blocking
             response = await asyncio.to_thread(
@@ -217,8 +213,7 @@ async def score_relevance(
 
             # Extract scores and place them in correct positions
             for result in response.results:
-                original_idx = i + result.index
-                all_scores[original_idx] = result.relevance_score
+                all_scores[i + result.index] = result.relevance_score
 
             await _log_usage(
                 usage_operation,
@@ -232,7 +227,76 @@ async def score_relevance(
     except Exception as e:
         logger.error(f"Cohere reranking failed: {e}")
         # Return neutral scores on error
-        return [0.5] * len(candidates)
+        return np.full(len(documents), 0.5, dtype=np.float64)
+
+
+async def select_relevant(
+    query: str,
+    documents: Sequence[str],
+    *,
+    threshold: float = CROSS_ENCODER_THRESHOLD,
+    limit: int | None = None,
+    batch_size: int = MAX_BATCH_SIZE,
+    user_id: str | None = None,
+    usage_operation: str = "cross_encoder.filter",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return (indices, scores) of documents scoring at least the threshold.
+
+    When a limit is given, documents are scored in batches and scoring stops
+    once that many have passed, so callers should pass their best candidates
+    first. Rerank requests are billed per call, so a batch is never smaller
+    than the limit and early exit needs no more calls than scoring everything.
+    Results are sorted by score (descending).
+    """
+    if not documents:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+
+    step = len(documents) if limit is None else max(1, batch_size, limit)
+    scores = np.full(len(documents), -np.inf, dtype=np.float64)
+    passed = 0
+
+    for start in range(0, len(documents), step):
+        batch_scores = await score_texts(
+            query,
+            documents[start:start + step],
+            user_id=user_id,
+            usage_operation=usage_operation,
+        )
+        scores[start:start + len(batch_scores)] = batch_scores
+        passed += int(np.count_nonzero(batch_scores >= threshold))
+        if limit is not None and passed >= limit:
+            break
+
+    keep = np.flatnonzero(scores >= threshold)
+    order = keep[np.argsort(-scores[keep], kind="stable")]
+    return order, scores[order]
+
+
+async def score_relevance(
+    query: str,
+    candidates: Sequence[dict[str, Any]],
+    *,
+    user_id: str | None = None,
+    usage_operation: str = "cross_encoder.score_relevance",
+) -> list[float]:
+    """Score relevance between query and candidates using Cohere rerank API.
+
+    Returns scores in same order as input candidates.
+    Higher scores indicate better relevance.
+    """
+    if not candidates:
+        return []
+
+    if not query.strip():
+        return [0.0] * len(candidates)
+
+    scores = await score_texts(
+        query,
+        prepare_documents(candidates),
+        user_id=user_id,
+        usage_operation=usage_operation,
+    )
+    return scores.tolist()
 
 
 # async def score_relevance_ondevice(
@@ -275,31 +339,33 @@ async def filter_by_relevance(
     candidates: Sequence[dict[str, Any]],
     threshold: float = CROSS_ENCODER_THRESHOLD,
     *,
+    limit: int | None = None,
     user_id: str | None = None,
 ) -> list[dict[str, Any]]:
-    """Filter candidates by cross-encoder relevance score."""
+    """Filter candidates by cross-encoder relevance score.
+
+    With a limit, scoring stops early once enough candidates pass.
+    """
     if not candidates:
         return []
 
-    # Score all candidates
-    scores = await score_relevance(
+    # An empty query scores 0.0 everywhere, so skip building documents
+    documents = prepare_documents(candidates) if query.strip() else [""] * len(candidates)
+    indices, scores = await select_relevant(
         query,
-        candidates,
+        documents,
+        threshold=threshold,
+        limit=limit,
         user_id=user_id,
         usage_operation="cross_encoder.filter",
     )
 
-    # Add scores to candidates and filter
+    # Add cross-encoder scores to the surviving candidates (already sorted)
     filtered = []
-    for candidate, score in zip(candidates, scores):
-        if score >= threshold:
-            # Add cross-encoder score to the result
-            enhanced_candidate = candidate.copy()
-            enhanced_candidate["cross_encoder_score"] = float(score)
-            filtered.append(enhanced_candidate)
-
-    # Sort by cross-encoder score (descending)
-    filtered.sort(key=lambda x: x.get("cross_encoder_score", 0), reverse=True)
+    for idx, score in zip(indices, scores):
+        enhanced_candidate = candidates[idx].copy()
+        enhanced_candidate["cross_encoder_score"] = float(score)
+        filtered.append(enhanced_candidate)
 
     return filtered
 
@@ -13,6 +13,7 @@ from . import cross_encoder
 SEMANTIC_SCORE_THRESHOLD = 0.35  # lighter pre-filter; rely more on reranker
 SEMANTIC_FETCH_MULTIPLIER = 4    # Get more candidates for cross-encoder
 CROSS_ENCODER_THRESHOLD = 0.35   # Raise to crop rankings earlier
+MIN_EF_SEARCH = 40               # HNSW candidate pool floor for chunk search
 
 
 # === SEARCH HELPERS ===
@@ -20,6 +21,9 @@ CROSS_ENCODER_THRESHOLD = 0.35   # Raise to crop rankings earlier
 
 def _safe_float(value: Any) -> float:
     """Convert arbitrary values to float, returning 0.0 on failure."""
+    # Fast path: the driver already returns floats for computed scores
+    if type(value) is float:
+        return value
     try:
         return float(value)
     except (TypeError, ValueError):
@@ -45,14 +49,21 @@ async def _rank_items_from_chunks(
     limit: int,
 ) -> list[dict[str, Any]]:
     """Pick the best chunk per item to represent each item."""
-    seen: set[str] = set()
-    results: list[dict[str, Any]] = []
+    if limit <= 0:
+        return []
+
+    # Maps item id -> slot in `results`; setdefault doubles as the membership check
+    seen: dict[str, int] = {}
+    results: list[dict[str, Any] | None] = [None] * limit
+    filled = 0
 
     for row in rows:
-        item_id = str(row.get("item_id"))
-        if not item_id or item_id in seen:
+        item_id = row.get("item_id")
+        if item_id is None:
+            continue
+        item_id = str(item_id)
+        if seen.setdefault(item_id, filled) != filled:
             continue
-        seen.add(item_id)
 
         # Build result with preview from chunk content
         result = {
@@ -61,14 +72,49 @@ async def _rank_items_from_chunks(
         }
 
         # Include other fields if present
-        for key in ["title", "summary", "score", "distance", "url"]:
-            if key in row and row[key] is not None:
-                result[key] = row[key]
-
-        results.append(result)
-        if len(results) >= limit:
+        for key in ("title", "summary", "score", "distance", "url"):
+            value = row.get(key)
+            if value is not None:
+                result[key] = value
+
+        results[filled] = result
+        filled += 1
+        if filled == limit:
             break
 
+    return results[:filled]  # type: ignore[return-value]
+
+
+async def _rerank_rows(
+    query: str,
+    rows: Sequence[dict[str, Any]],
+    *,
+    limit: int,
+    user_id: str,
+) -> list[dict[str, Any]]:
+    """Cross-encoder filter and rerank, stopping once `limit` rows pass.
+
+    Rows arrive ordered by semantic score, so the strongest candidates are
+    scored first and the early exit triggers as soon as possible.
+    """
+    if not rows:
+        return []
+
+    # Only the document texts go to the reranker; rows are gathered by index
+    texts = cross_encoder.prepare_documents(rows)
+    indices, scores = await cross_encoder.select_relevant(
+        query,
+        texts,
+        threshold=CROSS_ENCODER_THRESHOLD,
+        limit=limit,
+        user_id=user_id,
+    )
+
+    results: list[dict[str, Any]] = []
+    for idx, score in zip(indices, scores):
+        row = rows[idx]
+        row["cross_encoder_score"] = float(score)
+        results.append(row)
     return results
 
 
@@ -131,10 +177,10 @@ async def semantic(
         semantic_filtered = _filter_by_score(rows)
 
         # 3. Cross-encoder relevance filtering and reranking
-        cross_encoder_filtered = await cross_encoder.filter_by_relevance(
-            query=query,
-            candidates=semantic_filtered,
-            threshold=CROSS_ENCODER_THRESHOLD,
+        cross_encoder_filtered = await _rerank_rows(
+            query,
+            semantic_filtered,
+            limit=limit,
             user_id=user_id,
         )
 
@@ -142,45 +188,34 @@ async def semantic(
         if len(cross_encoder_filtered) >= limit:
             return cross_encoder_filtered[:limit]
 
-        # 5. Lexical fallback for remaining slots
+        # 5. Lexical fallback for remaining slots (excluding items already kept)
         remaining = limit - len(cross_encoder_filtered)
         lexical_rows = await db.lexical_search_items(
             user_id=user_id,
             query_text=query,
             columns=cols,
             limit=remaining,
+            exclude_ids=[row["id"] for row in cross_encoder_filtered],
         )
 
-        # Combine results, avoiding duplicates
-        seen_ids = {str(row.get("id")) for row in cross_encoder_filtered}
-        for row in lexical_rows:
-            item_id = str(row.get("id"))
-            if item_id not in seen_ids:
-                cross_encoder_filtered.append(row)
-                seen_ids.add(item_id)
-                if len(cross_encoder_filtered) >= limit:
-                    break
-
+        cross_encoder_filtered.extend(lexical_rows)
         return cross_encoder_filtered[:limit]
 
     else:  # scope == "chunks"
-        # 1. Semantic search on chunks (get more candidates)
-        chunk_rows = await db.semantic_search_chunks(
+        # 1-2. Best chunk per item with the light score filter applied in SQL
+        ranked_items = await db.semantic_search_best_chunk_per_item(
             user_id=user_id,
             query_vector=query_vec,
-            columns=columns,
-            limit=fetch_limit * 3,
+            limit=fetch_limit,
+            min_score=SEMANTIC_SCORE_THRESHOLD,
+            ef_search=max(MIN_EF_SEARCH, fetch_limit * 2),
         )
 
-        # 2. Light semantic score filter and rank items
-        semantic_filtered_chunks = _filter_by_score(chunk_rows)
-        ranked_items = await _rank_items_from_chunks(semantic_filtered_chunks, fetch_limit)
-
         # 3. Cross-encoder relevance filtering and reranking
-        cross_encoder_filtered = await cross_encoder.filter_by_relevance(
-            query=query,
-            candidates=ranked_items,
-            threshold=CROSS_ENCODER_THRESHOLD,
+        cross_encoder_filtered = await _rerank_rows(
+            query,
+            ranked_items,
+            limit=limit,
             user_id=user_id,
         )
 
@@ -188,13 +223,14 @@ async def semantic(
         if len(cross_encoder_filtered) >= limit:
             return cross_encoder_filtered[:limit]
 
-        # 5. Lexical fallback for remaining slots
+        # 5. Lexical fallback for remaining slots (excluding items already kept)
         remaining = limit - len(cross_encoder_filtered)
         lexical_chunk_rows = await db.lexical_search_chunks(
             user_id=user_id,
             query_text=query,
             columns=columns,
             limit=remaining * 3,
+            exclude_ids=[row["id"] for row in cross_encoder_filtered],
         )
 
         lexical_ranked = await _rank_items_from_chunks(lexical_chunk_rows, remaining)
@@ -206,14 +242,5 @@ async def semantic(
                 user_id=user_id,
             )
 
-        # Combine results, avoiding duplicates
-        seen_ids = {str(row.get("id")) for row in cross_encoder_filtered}
-        for row in lexical_ranked:
-            item_id = str(row.get("id"))
-            if item_id not in seen_ids:
-                cross_encoder_filtered.append(row)
-                seen_ids.add(item_id)
-                if len(cross_encoder_filtered) >= limit:
-                    break
-
+        cross_encoder_filtered.extend(lexical_ranked)
         return cross_encoder_filtered[:limit]
@@ -10,26 +10,27 @@ Provides fixtures for testing the Later System backend:
 - Service stubs for isolated testing
 """
 
+import base64
+import hashlib
+import json
 import os
 import sys
 import types
 import asyncio
-from pathlib import Path
 from urllib.parse import urlparse, urlunparse
 import uuid
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 import psycopg
 from psycopg import sql
 import pytest
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from fastapi.testclient import TestClient
 
-# Ensure backend root (containing `app`) is importable
-BACKEND_ROOT = Path(__file__).resolve().parents[1]
-if str(BACKEND_ROOT) not in sys.path:
-    sys.path.insert(0, str(BACKEND_ROOT))
-
-
 def _select_test_database_url() -> str:
     """Determine the database URL to use for tests.
 
@@ -98,25 +99,31 @@ os.environ["DATABASE_URL"] = TEST_DATABASE_URL
 _ensure_isolated_database(TEST_DATABASE_URL)
 
 from app.main import app
+from app import auth
 from app import database as db
 from app import services as app_services
 
 
 # --- Database Fixtures ---
 
-@pytest.fixture
-async def database():
-    """Initialize database pool for tests and reset data between tests."""
+@pytest.fixture(scope="session")
+def _reset_database():
+    """Empty the test database once, before any module opens a pool."""
+    with psycopg.connect(TEST_DATABASE_URL, autocommit=True) as conn:
+        conn.execute("TRUNCATE item_chunks, items, llm_usage_logs, users CASCADE")
+
+
+@pytest.fixture(scope="module")
+async def database(_reset_database):
+    """Initialize database pool once per module; data is reset once per run.
+
+    Cooperative tests (across modules) run concurrently on one event loop,
+    so data is not reset between tests; each test gets its own user from
+    `authed_user` (or registers a uniquely named one) and only sees its
+    own items.
+    """
     await db.init_pool()
     
-    # Reset database between tests
-    async with db.get_connection() as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(
-                "TRUNCATE item_chunks, items, llm_usage_logs, users CASCADE"
-            )
-        await conn.commit()
-    
     yield db
     
     await db.close_pool()
@@ -124,28 +131,99 @@ async def database():
 
 # --- Client Fixtures ---
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
-    """Return a TestClient instance for synchronous tests."""
+    """Return a TestClient shared by the synchronous tests in a module.
+
+    Entering the client runs the app lifespan (pool + schema setup), so it
+    is done once per module rather than per test.
+    """
     with TestClient(app) as test_client:
         yield test_client
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 async def async_client():
-    """Return an AsyncClient instance for async tests."""
-    from starlette.testclient import TestClient
-    from httpx import ASGITransport
-    
+    """Return an AsyncClient shared by the async tests in a module.
+
+    Requests are dispatched straight into the ASGI app in-process, so no
+    server or socket is involved.
+    """
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver") as async_client:
         yield async_client
 
 
+def _dumps(payload) -> bytes:
+    """Serialize a JSON body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+async def _post_json(client: AsyncClient, url: str, payload, **kwargs):
+    """POST `payload` as JSON, serialized up front instead of by httpx."""
+    headers = {"content-type": "application/json", **kwargs.pop("headers", {})}
+    return await client.post(url, content=_dumps(payload), headers=headers, **kwargs)
+
+
+@pytest.fixture
+def post_json():
+    """Return the `post_json(client, url, payload, **kwargs)` helper."""
+    return _post_json
+
+
 # --- Authentication Fixtures ---
 
+TEST_PASSWORD = "testpass123"
+
+# Single-iteration PBKDF2 hash of TEST_PASSWORD: accepted by
+# auth.verify_password (iterations are read from the hash) but free to build.
+_TEST_SALT = b"later-test-salt"
+PRECOMPUTED_PASSWORD_HASH = "pbkdf2_sha256$1${}${}".format(
+    base64.b64encode(_TEST_SALT).decode("ascii"),
+    base64.b64encode(
+        hashlib.pbkdf2_hmac("sha256", TEST_PASSWORD.encode("utf-8"), _TEST_SALT, 1)
+    ).decode("ascii"),
+)
+
+
+async def fast_user(database) -> dict:
+    """Insert a user row directly and mint its JWT, skipping /user/add and /auth/login."""
+    username = f"user_{uuid.uuid4().hex[:12]}"
+
+    async with database.get_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "INSERT INTO users (username, password_hash) VALUES (%s, %s) RETURNING id",
+                (username, PRECOMPUTED_PASSWORD_HASH),
+            )
+            row = await cur.fetchone()
+        await conn.commit()
+
+    user_id = str(row["id"])
+    token = auth.create_jwt_token(user_id, username)
+    return {
+        "user_id": user_id,
+        "username": username,
+        "headers": {"Authorization": f"Bearer {token}"},
+    }
+
+
+@pytest.fixture
+async def authed_user(database):
+    """A fresh user per test, so concurrently running tests never share items."""
+    return await fast_user(database)
+
+
+@pytest.fixture
+async def other_user(database):
+    """A second fresh user, for checking results stay scoped to `authed_user`."""
+    return await fast_user(database)
+
+
 @pytest.fixture
-async def user_credentials(client):
+def user_credentials(client):
     """Create a test user and return credentials."""
     username = f"test_user_{uuid.uuid4().hex[:8]}"
     password = "test_password"
@@ -1,4 +1,7 @@
-"""API endpoint tests for Later System backend using pytest-asyncio."""
+"""API endpoint tests for Later System backend.
+
+Tests run concurrently on one event loop via pytest-asyncio-cooperative.
+"""
 
 from __future__ import annotations
 
@@ -10,23 +13,33 @@ import pytest
 from httpx import AsyncClient
 
 
-@pytest.mark.asyncio
+# Unique URL/username suffixes, minted once at import rather than per test
+_UUID_POOL = [uuid.uuid4().hex for _ in range(64)]
+_uuid_iter = iter(_UUID_POOL)
+
+
+def _next_uuid() -> str:
+    """Next pre-minted suffix, or a fresh one once the pool runs out (e.g. under pytest-repeat)."""
+    return next(_uuid_iter, None) or uuid.uuid4().hex
+
+
+@pytest.mark.asyncio_cooperative
 async def test_authentication_required(async_client: AsyncClient):
     """Test that authentication is required for protected endpoints."""
     response = await async_client.get("/items/select")
     assert response.status_code == 401, response.text
 
 
-@pytest.mark.asyncio
-async def test_user_registration_and_login(async_client: AsyncClient, database):
+@pytest.mark.asyncio_cooperative
+async def test_user_registration_and_login(async_client: AsyncClient, database, post_json):
     """Test user registration and login flow."""
     # Generate unique username for test
-    username = f"user_{uuid.uuid4().hex[:12]}"
+    username = f"user_{_next_uuid()[:12]}"
     password = "testpass123"
     
     # Register user
-    response = await async_client.post(
-        "/user/add", json={"username": username, "password": password}
+    response = await post_json(
+        async_client, "/user/add", {"username": username, "password": password}
     )
     assert response.status_code == 201, response.text
     user_payload = response.json()
@@ -34,8 +47,8 @@ async def test_user_registration_and_login(async_client: AsyncClient, database):
     assert user_id, f"Missing user_id in response: {user_payload}"
     
     # Login with created user
-    login_response = await async_client.post(
-        "/auth/login", json={"username": username, "password": password}
+    login_response = await post_json(
+        async_client, "/auth/login", {"username": username, "password": password}
     )
     assert login_response.status_code == 200, login_response.text
     token_payload = login_response.json()
@@ -43,128 +56,133 @@ async def test_user_registration_and_login(async_client: AsyncClient, database):
     assert token, f"Missing access_token in response: {token_payload}"
 
 
-@pytest.mark.asyncio
-async def test_items_crud_flow(async_client: AsyncClient, database):
-    """Test complete item CRUD operations flow."""
-    # Setup user
-    username = f"user_{uuid.uuid4().hex[:12]}"
-    password = "testpass123"
-    
-    # Register user
-    reg_response = await async_client.post(
-        "/user/add", json={"username": username, "password": password}
-    )
-    assert reg_response.status_code == 201
-    user_id = reg_response.json().get("user_id")
-    
-    # Login
-    login_response = await async_client.post(
-        "/auth/login", json={"username": username, "password": password}
-    )
-    assert login_response.status_code == 200
-    token = login_response.json().get("access_token")
-    headers = {"Authorization": f"Bearer {token}"}
+@pytest.mark.asyncio_cooperative
+async def test_items_crud_flow(async_client: AsyncClient, database, authed_user, post_json):
+    """Test complete item CRUD operations flow over a batch of items."""
+    user_id = authed_user["user_id"]
+    headers = authed_user["headers"]
     
-    # Create item
+    # Create items concurrently
     now = datetime.now(timezone.utc)
-    item_url = f"https://example.com/{uuid.uuid4().hex}"
-    item_payload = {
-        "url": item_url,
-        "client_status": "adding",
-        "client_status_at": now.isoformat(),
-        "server_status": "saved",
-        "server_status_at": now.isoformat(),
-        "user_id": user_id,
-        "title": "Testing article",
-        "content_text": "This content is used for verifying item flows.",
-    }
-    
-    created_item = await database.create_item(item_payload)
-    item_id = str(created_item.get("id"))
-    assert item_id, f"Failed to create item with payload: {item_payload}"
+    item_payloads = [
+        {
+            "url": f"https://example.com/{_next_uuid()}",
+            "client_status": "adding",
+            "client_status_at": now.isoformat(),
+            "server_status": "saved",
+            "server_status_at": now.isoformat(),
+            "user_id": user_id,
+            "title": f"Testing article {index}",
+            "content_text": "This content is used for verifying item flows.",
+        }
+        for index in range(3)
+    ]
+    
+    created_items = await asyncio.gather(
+        *(database.create_item(payload) for payload in item_payloads)
+    )
+    item_ids = [str(item.get("id")) for item in created_items]
+    assert all(item_ids), f"Failed to create items with payloads: {item_payloads}"
     
     # Select items
     select_response = await async_client.get("/items/select", headers=headers)
     assert select_response.status_code == 200, select_response.text
-    items = select_response.json()
-    assert any(row.get("id") == item_id for row in items), f"Created item {item_id} not in items list"
+    selected_ids = {row.get("id") for row in select_response.json()}
+    assert set(item_ids) <= selected_ids, f"Created items {item_ids} not in items list"
     
-    # Update item
-    update_response = await async_client.post(
+    # Update all items in one request
+    update_response = await post_json(
+        async_client,
         "/items/update",
-        headers=headers,
-        json={
-            "item_ids": [item_id],
+        {
+            "item_ids": item_ids,
             "updates": {"client_status": "completed"},
         },
+        headers=headers,
     )
     assert update_response.status_code == 200, update_response.text
-    update_payload = update_response.json()["results"][item_id]
-    assert update_payload["updated"] is True, f"Update failed: {update_payload}"
+    update_results = update_response.json()["results"]
+    assert all(update_results[item_id]["updated"] is True for item_id in item_ids), \
+           f"Update failed: {update_results}"
     
-    # Verify update with filtered select
+    # Verify updates with one filtered select
     filtered_response = await async_client.get(
         "/items/select",
         headers=headers,
-        params=[("filter", f"id:=:{item_id}"), ("columns", "id"), ("columns", "client_status")],
+        params=[
+            ("filter", f"id:IN:{','.join(item_ids)}"),
+            ("columns", "id"),
+            ("columns", "client_status"),
+        ],
     )
     assert filtered_response.status_code == 200, filtered_response.text
-    filtered_items = filtered_response.json()
-    assert filtered_items and filtered_items[0]["client_status"] == "completed", \
-           f"Item update not reflected: {filtered_items}"
+    statuses = {row["id"]: row["client_status"] for row in filtered_response.json()}
+    assert statuses == {item_id: "completed" for item_id in item_ids}, \
+           f"Item updates not reflected: {statuses}"
     
-    # Delete item
-    delete_response = await async_client.post(
+    # Delete all items in one request
+    delete_response = await post_json(
+        async_client,
         "/items/delete",
+        {"item_ids": item_ids},
         headers=headers,
-        json={"item_ids": [item_id]},
     )
     assert delete_response.status_code == 200, delete_response.text
-    delete_payload = delete_response.json()["results"]
-    assert delete_payload[item_id] is True, f"Delete operation failed: {delete_payload}"
+    delete_results = delete_response.json()["results"]
+    assert all(delete_results[item_id] is True for item_id in item_ids), \
+           f"Delete operation failed: {delete_results}"
     
     # Verify deletion
     final_response = await async_client.get("/items/select", headers=headers)
     assert final_response.status_code == 200, final_response.text
-    assert not any(item.get("id") == item_id for item in final_response.json()), \
-           "Item still exists after deletion"
+    remaining_ids = {item.get("id") for item in final_response.json()}
+    assert remaining_ids.isdisjoint(item_ids), "Items still exist after deletion"
 
 
-@pytest.mark.asyncio
-async def test_items_search_lexical(async_client: AsyncClient, database):
+@pytest.mark.asyncio_cooperative
+async def test_items_search_lexical(async_client: AsyncClient, database, authed_user):
     """Test lexical search functionality."""
-    # Setup user
-    username = f"user_{uuid.uuid4().hex[:12]}"
-    password = "testpass123"
+    user_id = authed_user["user_id"]
+    headers = authed_user["headers"]
     
-    # Register and login
-    reg_response = await async_client.post(
-        "/user/add", json={"username": username, "password": password}
-    )
-    user_id = reg_response.json().get("user_id")
-    
-    login_response = await async_client.post(
-        "/auth/login", json={"username": username, "password": password}
-    )
-    token = login_response.json().get("access_token")
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    # Create test item
+    # Create the target item alongside unrelated items in one batch
     now = datetime.now(timezone.utc)
-    item_payload = {
-        "url": f"https://example.com/{uuid.uuid4().hex}",
-        "client_status": "adding",
-        "client_status_at": now.isoformat(),
-        "server_status": "saved",
-        "server_status_at": now.isoformat(),
-        "user_id": user_id,
-        "title": "Python Testing",
-        "content_text": "Python testing strategies and fixtures are useful.",
-        "summary": "Notes on Python testing.",
-    }
-    
-    created_item = await database.create_item(item_payload)
-    item_id = str(created_item.get("id"))
+    documents = [
+        (
+            "Python Testing",
+            "Python testing strategies and fixtures are useful.",
+            "Notes on Python testing.",
+        ),
+        (
+            "Sourdough Basics",
+            "Starter hydration and proving times for bread.",
+            "Notes on baking bread.",
+        ),
+        (
+            "Alpine Routes",
+            "Planning hut-to-hut walks across mountain passes.",
+            "Notes on hiking trips.",
+        ),
+    ]
+    item_payloads = [
+        {
+            "url": f"https://example.com/{_next_uuid()}",
+            "client_status": "adding",
+            "client_status_at": now.isoformat(),
+            "server_status": "saved",
+            "server_status_at": now.isoformat(),
+            "user_id": user_id,
+            "title": title,
+            "content_text": content_text,
+            "summary": summary,
+        }
+        for title, content_text, summary in documents
+    ]
+    
+    created_items = await database.create_items_bulk(item_payloads)
+    assert len(created_items) == len(item_payloads)
+    item_id = str(created_items[0].get("id"))
+    other_ids = {str(item.get("id")) for item in created_items[1:]}
     assert item_id
     
     # Perform lexical search
@@ -182,4 +200,6 @@ async def test_items_search_lexical(async_client: AsyncClient, database):
     results = search_response.json()["results"]
     assert results, "Expected at least one search result"
     assert any(row.get("id") == item_id for row in results), \
-           f"Search didn't return expected item {item_id}"
\ No newline at end of file
+           f"Search didn't return expected item {item_id}"
+    assert not any(row.get("id") in other_ids for row in results), \
+           f"Search returned unrelated items: {results}"
@@ -1,178 +1,280 @@
-#!/usr/bin/env python3
+"""Tests for cross-encoder search functionality."""
 
-import asyncio
-import unittest
-import sys
+from contextvars import ContextVar
 import os
 
-# Add the app directory to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
-
-from app.services import cross_encoder
-
-
-class TestCrossEncoderSearch(unittest.TestCase):
-    """Unit tests for cross-encoder search functionality."""
-
-    def setUp(self):
-        """Set up test fixtures."""
-        self.test_query = "funding startup investment"
-        self.test_candidates = [
-            {
-                "id": "1",
-                "title": "Startup raises $10M in Series A funding round",
-                "summary": "Tech company secures major investment to expand operations",
-                "score": 0.8
-            },
-            {
-                "id": "2", 
-                "title": "Weather forecast for tomorrow",
-                "summary": "It will be sunny with temperatures reaching 75°F",
-                "score": 0.7
-            },
-            {
-                "id": "3",
-                "title": "Recipe for chocolate cake",
-                "summary": "Delicious dessert recipe with step-by-step instructions",
-                "score": 0.6
-            },
-            {
-                "id": "4",
-                "title": "Anthropic raises $13B Series F funding",
-                "summary": "AI company secures massive investment round",
-                "score": 0.9
-            }
-        ]
-
-    async def async_test_score_relevance(self):
-        """Test cross-encoder relevance scoring."""
-        scores = await cross_encoder.score_relevance(self.test_query, self.test_candidates)
-        
-        # Should return one score per candidate
-        self.assertEqual(len(scores), len(self.test_candidates))
-        
-        # All scores should be numeric
-        for score in scores:
-            self.assertIsInstance(score, (int, float))
-        
-        # Funding-related items should score higher than irrelevant ones
-        # Note: actual scores depend on the model, but relative ordering should hold
-        funding_indices = [0, 3]  # Startup funding and Anthropic funding
-        irrelevant_indices = [1, 2]  # Weather and recipe
-        
-        max_irrelevant_score = max(scores[i] for i in irrelevant_indices)
-        min_funding_score = min(scores[i] for i in funding_indices)
-        
-        # This might not always hold due to model variations, so we'll just check structure
-        print(f"Funding scores: {[scores[i] for i in funding_indices]}")
-        print(f"Irrelevant scores: {[scores[i] for i in irrelevant_indices]}")
-
-    async def async_test_filter_by_relevance(self):
-        """Test filtering candidates by relevance threshold."""
-        # Use a moderate threshold
-        threshold = -10.0
-        
-        filtered = await cross_encoder.filter_by_relevance(
-            self.test_query, 
-            self.test_candidates,
-            threshold
-        )
-        
-        # Should return a list
-        self.assertIsInstance(filtered, list)
-        
-        # All results should have cross_encoder_score
-        for result in filtered:
-            self.assertIn("cross_encoder_score", result)
-            self.assertIsInstance(result["cross_encoder_score"], (int, float))
-        
-        # Results should be sorted by cross_encoder_score (descending)
-        if len(filtered) > 1:
-            scores = [r["cross_encoder_score"] for r in filtered]
-            self.assertEqual(scores, sorted(scores, reverse=True))
-
-    async def async_test_rerank_by_relevance(self):
-        """Test reranking candidates by relevance."""
-        reranked = await cross_encoder.rerank_by_relevance(self.test_query, self.test_candidates)
-        
-        # Should return same number of candidates
-        self.assertEqual(len(reranked), len(self.test_candidates))
-        
-        # All should have cross_encoder_score
-        for result in reranked:
-            self.assertIn("cross_encoder_score", result)
-        
-        # Should be sorted by cross_encoder_score
-        scores = [r["cross_encoder_score"] for r in reranked]
-        self.assertEqual(scores, sorted(scores, reverse=True))
-
-    async def async_test_empty_inputs(self):
-        """Test handling of empty inputs."""
+import pytest
+
+from app.services import cross_encoder, searching
+
+
+TEST_QUERY = "funding startup investment"
+TEST_CANDIDATES = [
+    {
+        "id": "1",
+        "title": "Startup raises $10M in Series A funding round",
+        "summary": "Tech company secures major investment to expand operations",
+        "score": 0.8
+    },
+    {
+        "id": "2", 
+        "title": "Weather forecast for tomorrow",
+        "summary": "It will be sunny with temperatures reaching 75°F",
+        "score": 0.7
+    },
+    {
+        "id": "3",
+        "title": "Recipe for chocolate cake",
+        "summary": "Delicious dessert recipe with step-by-step instructions",
+        "score": 0.6
+    },
+    {
+        "id": "4",
+        "title": "Anthropic raises $13B Series F funding",
+        "summary": "AI company secures massive investment round",
+        "score": 0.9
+    }
+]
+
+MALFORMED_CANDIDATES = [
+    {"id": "1"},  # Missing title and summary
+    {"title": "Only title"},  # Missing summary
+    {"summary": "Only summary"},  # Missing title
+    {}  # Empty candidate
+]
+
+class _FakeRerankResult:
+    def __init__(self, index: int, relevance_score: float) -> None:
+        self.index = index
+        self.relevance_score = relevance_score
+
+
+class _FakeRerankResponse:
+    def __init__(self, results: list[_FakeRerankResult]) -> None:
+        self.results = results
+
+
+class _FakeRerankClient:
+    """Deterministic stand-in for the Cohere client: scores by query-term overlap.
+
+    `calls` records the batch size of every rerank request.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    def rerank(self, *, query, documents, model, top_n, return_documents=False):
+        self.calls.append(len(documents))
+        terms = set(query.lower().split())
+        results = []
+        for index, document in enumerate(documents):
+            overlap = terms & set(document.lower().split())
+            results.append(_FakeRerankResult(index, len(overlap) / max(len(terms), 1)))
+        results.sort(key=lambda result: result.relevance_score, reverse=True)
+        return _FakeRerankResponse(results[:top_n])
+
+
+# The client installed by the running test; tests run concurrently, so each
+# test installs its own here instead of monkeypatching the module
+_fake_client: ContextVar[_FakeRerankClient | None] = ContextVar("fake_rerank_client", default=None)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _route_fake_reranker():
+    """Serve the running test's `_FakeRerankClient`, if it installed one, in place of Cohere."""
+    real_client = cross_encoder._get_cohere_client
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(cross_encoder, "_get_cohere_client", lambda: _fake_client.get() or real_client())
+        yield
+
+
+def _use_fake_reranker() -> _FakeRerankClient:
+    """Route the calling test's reranking through a fresh `_FakeRerankClient`."""
+    client = _FakeRerankClient()
+    _fake_client.set(client)
+    return client
+
+
+@pytest.mark.asyncio_cooperative
+async def test_score_relevance():
+    """Test cross-encoder relevance scoring."""
+    _use_fake_reranker()
+    scores = await cross_encoder.score_relevance(TEST_QUERY, TEST_CANDIDATES)
+    
+    # Should return one score per candidate
+    assert len(scores) == len(TEST_CANDIDATES)
+    
+    # All scores should be numeric
+    for score in scores:
+        assert isinstance(score, (int, float))
+    
+    # Funding-related items should score higher than irrelevant ones
+    funding_indices = [0, 3]  # Startup funding and Anthropic funding
+    irrelevant_indices = [1, 2]  # Weather and recipe
+    assert min(scores[i] for i in funding_indices) > max(scores[i] for i in irrelevant_indices)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio_cooperative
+async def test_score_relevance_real():
+    """Test relevance scoring against the real Cohere reranker."""
+    if os.environ.get("COHERE_API_KEY", "test-key") == "test-key":
+        pytest.skip("COHERE_API_KEY is not set to a real key")
+
+    scores = await cross_encoder.score_relevance(TEST_QUERY, TEST_CANDIDATES)
+    
+    # Should return one score per candidate
+    assert len(scores) == len(TEST_CANDIDATES)
+    
+    # Funding-related items should score higher than irrelevant ones
+    funding_indices = [0, 3]  # Startup funding and Anthropic funding
+    irrelevant_indices = [1, 2]  # Weather and recipe
+    assert min(scores[i] for i in funding_indices) > max(scores[i] for i in irrelevant_indices), \
+           f"Unexpected ordering: {scores}"
+
+
+@pytest.mark.asyncio_cooperative
+async def test_filter_by_relevance():
+    """Test filtering candidates by relevance threshold."""
+    _use_fake_reranker()
+    # Use a moderate threshold
+    threshold = -10.0
+    
+    filtered = await cross_encoder.filter_by_relevance(
+        TEST_QUERY, 
+        TEST_CANDIDATES,
+        threshold
+    )
+    
+    # Should return a list
+    assert isinstance(filtered, list)
+    
+    # All results should have cross_encoder_score
+    for result in filtered:
+        assert "cross_encoder_score" in result
+        assert isinstance(result["cross_encoder_score"], (int, float))
+    
+    # Results should be sorted by cross_encoder_score (descending)
+    if len(filtered) > 1:
+        scores = [r["cross_encoder_score"] for r in filtered]
+        assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.asyncio_cooperative
+async def test_rerank_by_relevance():
+    """Test reranking candidates by relevance."""
+    _use_fake_reranker()
+    reranked = await cross_encoder.rerank_by_relevance(TEST_QUERY, TEST_CANDIDATES)
+    
+    # Should return same number of candidates
+    assert len(reranked) == len(TEST_CANDIDATES)
+    
+    # All should have cross_encoder_score
+    for result in reranked:
+        assert "cross_encoder_score" in result
+    
+    # Should be sorted by cross_encoder_score
+    scores = [r["cross_encoder_score"] for r in reranked]
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.asyncio_cooperative
+@pytest.mark.parametrize(
+    "query, candidates, expected_scores",
+    [
         # Empty candidates
-        scores = await cross_encoder.score_relevance(self.test_query, [])
-        self.assertEqual(scores, [])
-        
-        filtered = await cross_encoder.filter_by_relevance(self.test_query, [])
-        self.assertEqual(filtered, [])
-        
-        reranked = await cross_encoder.rerank_by_relevance(self.test_query, [])
-        self.assertEqual(reranked, [])
-        
-        # Empty query
-        scores = await cross_encoder.score_relevance("", self.test_candidates)
-        self.assertEqual(len(scores), len(self.test_candidates))
+        (TEST_QUERY, [], []),
         # Empty query should return neutral scores
-        for score in scores:
-            self.assertEqual(score, 0.0)
-
-    async def async_test_malformed_candidates(self):
-        """Test handling of candidates with missing fields."""
-        malformed_candidates = [
-            {"id": "1"},  # Missing title and summary
-            {"title": "Only title"},  # Missing summary
-            {"summary": "Only summary"},  # Missing title
-            {}  # Empty candidate
-        ]
-        
-        # Should not crash
-        scores = await cross_encoder.score_relevance(self.test_query, malformed_candidates)
-        self.assertEqual(len(scores), len(malformed_candidates))
-        
-        filtered = await cross_encoder.filter_by_relevance(self.test_query, malformed_candidates)
-        self.assertIsInstance(filtered, list)
-
-    def test_score_relevance(self):
-        """Synchronous wrapper for async test."""
-        asyncio.run(self.async_test_score_relevance())
-
-    def test_filter_by_relevance(self):
-        """Synchronous wrapper for async test."""
-        asyncio.run(self.async_test_filter_by_relevance())
-
-    def test_rerank_by_relevance(self):
-        """Synchronous wrapper for async test."""
-        asyncio.run(self.async_test_rerank_by_relevance())
-
-    def test_empty_inputs(self):
-        """Synchronous wrapper for async test."""
-        asyncio.run(self.async_test_empty_inputs())
-
-    def test_malformed_candidates(self):
-        """Synchronous wrapper for async test."""
-        asyncio.run(self.async_test_malformed_candidates())
-
-
-class TestCrossEncoderConfiguration(unittest.TestCase):
-    """Test cross-encoder configuration and model loading."""
-    
-    def test_model_constants(self):
-        """Test that configuration constants are reasonable."""
-        self.assertIsInstance(cross_encoder.CROSS_ENCODER_MODEL, str)
-        self.assertIsInstance(cross_encoder.CROSS_ENCODER_THRESHOLD, (int, float))
-        self.assertIsInstance(cross_encoder.MAX_BATCH_SIZE, int)
-        self.assertGreater(cross_encoder.MAX_BATCH_SIZE, 0)
+        ("", TEST_CANDIDATES, [0.0] * len(TEST_CANDIDATES)),
+        # Candidates with missing fields should not crash
+        (TEST_QUERY, MALFORMED_CANDIDATES, None),
+    ],
+    ids=["empty-candidates", "empty-query", "malformed-candidates"],
+)
+async def test_edge_cases(query, candidates, expected_scores):
+    """Test handling of empty inputs and malformed candidates."""
+    _use_fake_reranker()
+    scores = await cross_encoder.score_relevance(query, candidates)
+    assert len(scores) == len(candidates)
+    if expected_scores is not None:
+        assert scores == expected_scores
+
+    filtered = await cross_encoder.filter_by_relevance(query, candidates)
+    assert isinstance(filtered, list)
+
+    if not candidates:
+        assert filtered == []
+        reranked = await cross_encoder.rerank_by_relevance(query, candidates)
+        assert reranked == []
+
+
+@pytest.mark.asyncio_cooperative
+async def test_select_relevant_stops_once_limit_passes():
+    """Scoring stops after the batch in which `limit` documents pass."""
+    reranker = _use_fake_reranker()
+    documents = ["funding startup investment"] * 50
+
+    indices, scores = await cross_encoder.select_relevant(
+        TEST_QUERY, documents, threshold=0.5, limit=5, batch_size=20
+    )
+
+    assert reranker.calls == [20]
+    assert list(indices) == list(range(20))
+    assert all(score >= 0.5 for score in scores)
+
+
+@pytest.mark.asyncio_cooperative
+async def test_select_relevant_continues_until_limit_and_sorts():
+    """Too few passes in a batch fetch the next one; results are sorted by score."""
+    reranker = _use_fake_reranker()
+    documents = (
+        ["weather recipe"] * 17
+        + ["funding", "funding startup", "funding startup investment"]
+        + ["startup investment"] * 20
+        + ["funding startup investment"] * 20
+    )
+
+    indices, scores = await cross_encoder.select_relevant(
+        TEST_QUERY, documents, threshold=0.5, limit=5, batch_size=20
+    )
+
+    assert reranker.calls == [20, 20]
+    assert list(scores) == sorted(scores, reverse=True)
+    assert indices[0] == 19  # full match from the first batch ranks first
+    assert all(score >= 0.5 for score in scores)
+    assert len(indices) == 22  # 2 from the first batch, 20 from the second
+
+
+@pytest.mark.asyncio_cooperative
+async def test_filter_by_relevance_limit():
+    """filter_by_relevance with a limit never makes more rerank requests than without one."""
+    reranker = _use_fake_reranker()
+    candidates = [{"id": str(i), "title": "Startup funding investment"} for i in range(30)]
+
+    filtered = await cross_encoder.filter_by_relevance(TEST_QUERY, candidates, 0.5, limit=3)
+
+    assert reranker.calls == [len(candidates)]  # one request, as without a limit
+    assert len(filtered) == len(candidates)
+    assert all("cross_encoder_score" not in candidate for candidate in candidates)
+
+
+@pytest.mark.asyncio_cooperative
+async def test_rerank_rows():
+    """_rerank_rows returns every passing row it scored, best first."""
+    _use_fake_reranker()
+    rows = [dict(candidate) for candidate in TEST_CANDIDATES]
+
+    reranked = await searching._rerank_rows(TEST_QUERY, rows, limit=2, user_id="user")
+
+    assert [row["id"] for row in reranked] == ["1", "4"]
+    scores = [row["cross_encoder_score"] for row in reranked]
+    assert scores == sorted(scores, reverse=True)
+    assert all(score >= searching.CROSS_ENCODER_THRESHOLD for score in scores)
 
 
-if __name__ == "__main__":
-    # Run tests with more verbose output
-    unittest.main(verbosity=2)
\ No newline at end of file
+def test_model_constants():
+    """Test that configuration constants are reasonable."""
+    assert isinstance(cross_encoder.CROSS_ENCODER_MODEL, str)
+    assert isinstance(cross_encoder.CROSS_ENCODER_THRESHOLD, (int, float))
+    assert isinstance(cross_encoder.MAX_BATCH_SIZE, int)
+    assert cross_encoder.MAX_BATCH_SIZE > 0
@@ -0,0 +1,152 @@
+"""Search query tests against the test database (no HTTP round-trips).
+
+Tests run concurrently on one event loop via pytest-asyncio-cooperative.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import uuid
+
+import pytest
+
+from app import database as db
+from app.schemas import NN_EMBEDDING_SIZE
+
+
+def _item_payloads(user_id: str, titles: list[str], content_text: str) -> list[dict]:
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "url": f"https://example.com/{uuid.uuid4().hex}",
+            "client_status": "adding",
+            "client_status_at": now,
+            "server_status": "saved",
+            "server_status_at": now,
+            "user_id": user_id,
+            "title": title,
+            "content_text": content_text,
+        }
+        for title in titles
+    ]
+
+
+def _unit_vector(index: int) -> list[float]:
+    vector = [0.0] * NN_EMBEDDING_SIZE
+    vector[index] = 1.0
+    return vector
+
+
+@pytest.mark.asyncio_cooperative
+async def test_lexical_search_items_exclude_ids(database, authed_user):
+    """Test that item lexical search skips items passed in exclude_ids."""
+    user_id = authed_user["user_id"]
+    
+    created_items = await database.create_items_bulk(_item_payloads(
+        user_id,
+        ["Orchid care 0", "Orchid care 1"],
+        "Orchid watering and repotting schedules.",
+    ))
+    excluded_id, kept_id = (str(item["id"]) for item in created_items)
+    
+    rows = await database.lexical_search_items(
+        user_id=user_id,
+        query_text="orchid",
+        columns=["id"],
+        limit=5,
+        exclude_ids=[excluded_id],
+    )
+    result_ids = {str(row["id"]) for row in rows}
+    assert kept_id in result_ids, f"Expected {kept_id} in {result_ids}"
+    assert excluded_id not in result_ids, f"Excluded item returned: {result_ids}"
+
+
+@pytest.mark.asyncio_cooperative
+async def test_lexical_search_chunks_exclude_ids(database, authed_user):
+    """Test that chunk lexical search skips chunks of items in exclude_ids."""
+    user_id = authed_user["user_id"]
+    
+    created_items = await database.create_items_bulk(_item_payloads(
+        user_id,
+        ["Bonsai basics 0", "Bonsai basics 1"],
+        "Bonsai pruning and wiring.",
+    ))
+    excluded_id, kept_id = (str(item["id"]) for item in created_items)
+    for item_id in (excluded_id, kept_id):
+        await database.add_item_chunks(
+            item_id=item_id,
+            chunks=[{
+                "content_text": "Bonsai pruning and wiring through the seasons.",
+                "content_token_count": 8,
+                "mistral_embedding": _unit_vector(0),
+            }],
+        )
+    
+    rows = await database.lexical_search_chunks(
+        user_id=user_id,
+        query_text="bonsai",
+        columns=["item_id"],
+        limit=5,
+        exclude_ids=[excluded_id],
+    )
+    result_ids = {str(row["item_id"]) for row in rows}
+    assert kept_id in result_ids, f"Expected {kept_id} in {result_ids}"
+    assert excluded_id not in result_ids, f"Excluded item returned: {result_ids}"
+
+
+@pytest.mark.asyncio_cooperative
+async def test_semantic_search_best_chunk_per_item(database, authed_user, other_user):
+    """Test one row per item, best chunk as preview, user scoping and min_score."""
+    user_id = authed_user["user_id"]
+    
+    near_id, far_id = (str(item["id"]) for item in await database.create_items_bulk(
+        _item_payloads(user_id, ["Near item", "Far item"], "Vector search notes.")
+    ))
+    (foreign_id,) = (str(item["id"]) for item in await database.create_items_bulk(
+        _item_payloads(other_user["user_id"], ["Foreign item"], "Vector search notes.")
+    ))
+    
+    off_axis = [0.0] * NN_EMBEDDING_SIZE
+    off_axis[0], off_axis[2] = 0.6, 0.8  # distance ~0.89 from the query
+    chunks_by_item = {
+        near_id: [("near best", _unit_vector(0)), ("near second", off_axis)],
+        far_id: [("far", _unit_vector(1))],  # distance sqrt(2) from the query
+        foreign_id: [("foreign", _unit_vector(0))],  # another user's exact match
+    }
+    for item_id, chunks in chunks_by_item.items():
+        await database.add_item_chunks(
+            item_id=item_id,
+            chunks=[
+                {"content_text": text, "content_token_count": 2, "mistral_embedding": vector}
+                for text, vector in chunks
+            ],
+        )
+    
+    rows = await database.semantic_search_best_chunk_per_item(
+        user_id=user_id,
+        query_vector=_unit_vector(0),
+        limit=5,
+    )
+    assert [str(row["id"]) for row in rows] == [near_id, far_id]
+    assert rows[0]["preview"] == "near best"
+    assert rows[0]["distance"] == pytest.approx(0.0, abs=1e-6)
+    assert rows[0]["score"] > rows[1]["score"]
+    
+    # score = 1 / (1 + distance): the far item scores ~0.41
+    rows = await database.semantic_search_best_chunk_per_item(
+        user_id=user_id,
+        query_vector=_unit_vector(0),
+        limit=5,
+        min_score=0.5,
+    )
+    assert [str(row["id"]) for row in rows] == [near_id]
+
+
+@pytest.mark.parametrize(
+    "extversion, supported",
+    [("0.8.0", True), ("0.10.1", True), ("0.6.2", False), ("0.7.4", False), (None, False)],
+)
+def test_iterative_scan_version_check(extversion, supported):
+    """Test that hnsw.iterative_scan is only used from pgvector 0.8."""
+    version = db._parse_version(extversion)
+    assert (version >= db.HNSW_ITERATIVE_SCAN_MIN_VERSION) is supported
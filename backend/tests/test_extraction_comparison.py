@@ -16,10 +16,19 @@ pytest.skip(
 )
 
 import asyncio
+import copy
+import functools
+import hashlib
+import html
+import io
+import shelve
 import sys
+import tarfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 import re
 
 # Add the server directory to the path
@@ -33,197 +42,326 @@ from app.services.extracting import extract_data
 import newspaper
 from newspaper import Article
 from readability import parse
-import html2text
 import requests
-from bs4 import BeautifulSoup
-from trafilatura import extract, fetch_url
+from requests.adapters import HTTPAdapter
+from lxml import etree
+from lxml import html as lxml_html
+from trafilatura import extract
+from trafilatura.utils import load_html
+
+
+# Quality metric and filename patterns
+# (one alternation, so the markdown is scanned once; each span counts once
+# and, like the old `.*?` patterns, never crosses a line break)
+_RE_ALL = re.compile(
+    r'(?P<hdr>^#+\s)'
+    r'|(?P<link>\[[^\]\n]*?\]\([^)\n]*?\))'
+    r'|(?P<bold>\*\*[^*\n]*?\*\*)'
+    r'|(?P<ital>\*[^*\n]*?\*)'
+    r'|(?P<code>`[^`\n]*?`)',
+    re.MULTILINE,
+)
+_RE_SAFE = re.compile(r'[^\w\-_.]')
+_TRANS = str.maketrans({':': '_', '/': '_'})
+_AD_RE = re.compile(
+    r'advertisement|sponsored|subscribe|newsletter|cookie|privacy policy|terms of service',
+    re.IGNORECASE,
+)
 
+# Downloaded HTML and its parsed tree, shared by every method run on a URL
+_HTML_CACHE: Dict[str, bytes] = {}
+_TREE_CACHE: Dict[str, lxml_html.HtmlElement] = {}
+_URL_LOCKS: Dict[str, threading.RLock] = {}
+_URL_LOCKS_GUARD = threading.Lock()
 
-class ExtractionMethod:
-    """Base class for extraction methods."""
+# One keep-alive connection pool for every requests-based method and URL
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
 
-    def __init__(self, name: str):
-        self.name = name
 
-    def extract(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-        """Extract content from URL. Returns (title, text, markdown)."""
-        raise NotImplementedError
+def _url_lock(url: str) -> threading.RLock:
+    """Per-URL lock so concurrent methods wait for one download/parse."""
+    with _URL_LOCKS_GUARD:
+        return _URL_LOCKS.setdefault(url, threading.RLock())
 
 
-class CurrentMethod(ExtractionMethod):
-    """Current trafilatura-based method."""
+def _get_html(url: str) -> bytes:
+    """Download a URL once per run; later calls (from any thread) reuse the bytes."""
+    html_bytes = _HTML_CACHE.get(url)
+    if html_bytes is not None:
+        return html_bytes
 
-    def __init__(self):
-        super().__init__("Current (Trafilatura Basic)")
+    with _url_lock(url):
+        html_bytes = _HTML_CACHE.get(url)
+        if html_bytes is None:
+            response = _SESSION.get(url, timeout=10)
+            response.raise_for_status()
+            html_bytes = _HTML_CACHE[url] = response.content
+    return html_bytes
 
-    async def extract(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-        item = await extract_data(url)
-        if item:
-            return item.title, item.text_content, item.markdown_content
-        return None, None, None
 
+def _get_text(url: str) -> str:
+    """Cached HTML for a URL decoded to text."""
+    return _get_html(url).decode('utf-8', 'replace')
 
-class TrafilaturaEnhanced(ExtractionMethod):
-    """Enhanced trafilatura with precision settings."""
 
-    def __init__(self, favor_precision: bool = True):
-        name = "Trafilatura (Precision)" if favor_precision else "Trafilatura (Recall)"
-        super().__init__(name)
-        self.favor_precision = favor_precision
+def _get_tree(url: str) -> Optional[lxml_html.HtmlElement]:
+    """Parse a URL's cached HTML once per run with trafilatura's loader."""
+    tree = _TREE_CACHE.get(url)
+    if tree is not None:
+        return tree
 
-    def extract(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-        try:
-            downloaded = fetch_url(url)
-            if not downloaded:
-                return None, None, None
-
-            # Extract with enhanced settings
-            text_content = extract(
-                downloaded,
-                output_format="txt",
-                include_comments=False,
-                include_tables=True,
-                include_links=True,
-                favor_precision=self.favor_precision,
-                deduplicate=True,
-            )
-
-            markdown_content = extract(
-                downloaded,
-                output_format="markdown",
-                include_comments=False,
-                include_tables=True,
-                include_links=True,
-                favor_precision=self.favor_precision,
-                deduplicate=True,
-            )
-
-            # Extract title using BeautifulSoup
-            soup = BeautifulSoup(downloaded, 'html.parser')
-            title = soup.find('title')
-            title = title.get_text().strip() if title else None
-
-            return title, text_content, markdown_content
-        except Exception as e:
-            print(f"TrafilaturaEnhanced error: {e}")
-            return None, None, None
+    with _url_lock(url):
+        tree = _TREE_CACHE.get(url)
+        if tree is None:
+            tree = load_html(_get_html(url))
+            if tree is not None:
+                _TREE_CACHE[url] = tree
+    return tree
 
 
-class NewspaperMethod(ExtractionMethod):
-    """Newspaper3k extraction method."""
+def _cache_key(method_name: str, url: str) -> str:
+    """Disk-cache key for a method's output on a URL.
 
-    def __init__(self):
-        super().__init__("Newspaper3k")
+    Changes when the page does, and when the method's implementation
+    version in `METHOD_VERSIONS` is bumped.
+    """
+    content_hash = hashlib.sha1(_get_html(url)).hexdigest()
+    version = METHOD_VERSIONS[method_name]
+    return hashlib.sha1(
+        f"{method_name}|v{version}|{url}|{content_hash}".encode('utf-8')
+    ).hexdigest()
 
-    def extract(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-        try:
-            article = Article(url)
-            article.download()
-            article.parse()
-
-            # Convert text to markdown using html2text
-            h = html2text.HTML2Text()
-            h.ignore_links = False
-            h.ignore_images = False
-            h.body_width = 0  # No line wrapping
-
-            # Create basic markdown from text
-            markdown = h.handle(f"# {article.title}\n\n{article.text}")
-
-            return article.title, article.text, markdown
-        except Exception as e:
-            print(f"Newspaper error: {e}")
-            return None, None, None
 
+# Sync extraction methods run here so every URL's methods overlap their I/O
+_EXECUTOR = ThreadPoolExecutor(max_workers=16)
 
-class ReadabilityMethod(ExtractionMethod):
-    """Python-readability extraction method."""
 
-    def __init__(self):
-        super().__init__("Python-Readability")
+# Page chrome dropped before picking the main content area
+_STRIP_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside')
+_CONTENT_XPATH = (
+    '//article | //*[@role="main"] | //main'
+    ' | //*[contains(concat(" ", normalize-space(@class), " "), " content ")]'
+    ' | //*[@id="content"]'
+)
 
-    def extract(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
 
-            # Use python-readability's parse function
-            result = parse(response.text)
-            title = result['title'] if result else None
-            html_content = result['content'] if result else ""
+def _element_text(element) -> str:
+    """One stripped line per text node, like get_text(separator='\\n', strip=True)."""
+    return '\n'.join(
+        text.strip() for text in element.itertext() if text.strip()
+    )
 
-            if not html_content:
-                return title, None, None
 
-            # Convert HTML to text and markdown
-            soup = BeautifulSoup(html_content, 'html.parser')
-            text_content = soup.get_text(separator='\n', strip=True)
+# Common case: a plain <title>...</title> near the top of the page
+_TITLE_RE = re.compile(r'<title[^>]*>([^<]{1,512})</title>', re.IGNORECASE)
 
-            # Convert to markdown
-            h = html2text.HTML2Text()
-            h.ignore_links = False
-            h.ignore_images = False
-            h.body_width = 0
-            markdown_content = h.handle(html_content)
 
-            return title, text_content, markdown_content
-        except Exception as e:
-            print(f"Readability error: {e}")
-            return None, None, None
+def _extract_title(document: str) -> Optional[str]:
+    """Read the <title> text, trying a regex before falling back to lxml."""
+    match = _TITLE_RE.search(document)
+    if match:
+        title = html.unescape(match.group(1)).strip()
+    else:
+        title = (lxml_html.fromstring(document).findtext('.//title') or '').strip()
+    return title or None
 
 
-class Html2TextMethod(ExtractionMethod):
-    """Html2text with BeautifulSoup for better markdown."""
+# (title, text, markdown)
+ExtractionResult = Tuple[Optional[str], Optional[str], Optional[str]]
 
-    def __init__(self):
-        super().__init__("BeautifulSoup + Html2Text")
 
-    def extract(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
+async def current_extract(url: str) -> ExtractionResult:
+    """Current trafilatura-based method (the app's own extract_data)."""
+    item = await extract_data(url)
+    if item:
+        return item.title, item.text_content, item.markdown_content
+    return None, None, None
 
-            soup = BeautifulSoup(response.text, 'html.parser')
 
-            # Extract title
-            title_tag = soup.find('title')
-            title = title_tag.get_text().strip() if title_tag else None
+def trafilatura_extract(url: str, favor_precision: bool = True) -> ExtractionResult:
+    """Enhanced trafilatura with precision settings."""
+    try:
+        tree = _get_tree(url)
+        if tree is None:
+            return None, None, None
 
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "header", "footer", "aside"]):
-                script.decompose()
+        # Extract with enhanced settings (trafilatura prunes the tree it
+        # is given, so each run gets a copy rather than a re-parse)
+        text_content = extract(
+            copy.deepcopy(tree),
+            output_format="txt",
+            include_comments=False,
+            include_tables=True,
+            include_links=True,
+            favor_precision=favor_precision,
+            deduplicate=True,
+        )
+
+        markdown_content = extract(
+            copy.deepcopy(tree),
+            output_format="markdown",
+            include_comments=False,
+            include_tables=True,
+            include_links=True,
+            favor_precision=favor_precision,
+            deduplicate=True,
+        )
+
+        # Extract title without parsing the whole page again
+        title = _extract_title(_get_text(url))
+
+        return title, text_content, markdown_content
+    except Exception as e:
+        print(f"Trafilatura error: {e}")
+        return None, None, None
 
-            # Try to find main content area
-            content = None
-            for selector in ['article', '[role="main"]', 'main', '.content', '#content']:
-                content = soup.select_one(selector)
-                if content:
-                    break
 
-            if not content:
-                content = soup.find('body')
+def newspaper_extract(url: str) -> ExtractionResult:
+    """Newspaper3k extraction method."""
+    try:
+        # Hand Newspaper the shared cached HTML rather than letting it download
+        article = Article(url)
+        article.download(input_html=_get_text(url))
+        article.parse()
+
+        # Create basic markdown from text
+        markdown = f"# {article.title}\n\n{article.text}"
+
+        return article.title, article.text, markdown
+    except Exception as e:
+        print(f"Newspaper error: {e}")
+        return None, None, None
 
-            if not content:
-                content = soup
 
-            # Convert to text and markdown
-            text_content = content.get_text(separator='\n', strip=True)
+def readability_extract(url: str) -> ExtractionResult:
+    """Python-readability extraction method."""
+    try:
+        # Use python-readability's parse function
+        result = parse(_get_text(url))
+        title = result['title'] if result else None
+        html_content = result['content'] if result else ""
+
+        if not html_content:
+            return title, None, None
+
+        # Convert HTML to text and markdown
+        text_content = _element_text(lxml_html.fromstring(html_content))
+
+        # Convert to markdown
+        markdown_content = extract(
+            html_content,
+            output_format="markdown",
+            include_links=True,
+            include_tables=True,
+        )
+
+        return title, text_content, markdown_content
+    except Exception as e:
+        print(f"Readability error: {e}")
+        return None, None, None
 
-            h = html2text.HTML2Text()
-            h.ignore_links = False
-            h.ignore_images = False
-            h.body_width = 0
-            h.ignore_emphasis = False
-            markdown_content = h.handle(str(content))
 
-            return title, text_content, markdown_content
-        except Exception as e:
-            print(f"Html2Text error: {e}")
+def lxml_markdown_extract(url: str) -> ExtractionResult:
+    """Boilerplate-stripped main content area converted to markdown."""
+    try:
+        # Work on a copy of the shared parse; stripping mutates the tree
+        tree = _get_tree(url)
+        if tree is None:
             return None, None, None
+        tree = copy.deepcopy(tree)
+
+        # Extract title
+        title = (tree.findtext('.//title') or '').strip() or None
+
+        # Remove script, style and page chrome in one C-level pass
+        etree.strip_elements(tree, *_STRIP_TAGS, with_tail=False)
+
+        # Try to find main content area (first match in document order)
+        matches = tree.xpath(_CONTENT_XPATH)
+        content = matches[0] if matches else tree.find('.//body')
+        if content is None:
+            content = tree
+
+        # Convert to text and markdown
+        text_content = _element_text(content)
+
+        markdown_content = extract(
+            lxml_html.tostring(content, encoding='unicode'),
+            output_format="markdown",
+            include_links=True,
+            include_tables=True,
+        )
+
+        return title, text_content, markdown_content
+    except Exception as e:
+        print(f"lxml markdown error: {e}")
+        return None, None, None
+
+
+# (name, is_async, extract function), in report order
+METHODS: List[Tuple[str, bool, Callable[[str], Any]]] = [
+    ("Current (Trafilatura Basic)", True, current_extract),
+    ("Trafilatura (Precision)", False, functools.partial(trafilatura_extract, favor_precision=True)),
+    ("Trafilatura (Recall)", False, functools.partial(trafilatura_extract, favor_precision=False)),
+    ("Newspaper3k", False, newspaper_extract),
+    ("Python-Readability", False, readability_extract),
+    ("lxml + Trafilatura Markdown", False, lxml_markdown_extract),
+]
+
+# Implementation version per method, part of the disk-cache key: bump a
+# method's entry whenever its extraction code changes so cached output from
+# the old implementation is not reported as the new one. The current
+# method runs the app's extract_data, so bump it after changing that too.
+METHOD_VERSIONS: Dict[str, int] = {
+    "Current (Trafilatura Basic)": 1,
+    "Trafilatura (Precision)": 2,  # shared lxml tree instead of fetch_url
+    "Trafilatura (Recall)": 2,
+    "Newspaper3k": 2,  # cached HTML, markdown built without html2text
+    "Python-Readability": 2,  # lxml text, trafilatura markdown
+    "lxml + Trafilatura Markdown": 1,  # formerly 'BeautifulSoup + Html2Text'
+}
+
+# Filename-safe method names, computed once since the names are fixed
+_METHOD_SAFE = {name: _RE_SAFE.sub('_', name) for name, _, _ in METHODS}
+
+
+@functools.lru_cache(maxsize=64)
+def _line_stats(text: str) -> Tuple[int, int, int]:
+    """(line count, total line length, ad/navigation lines) over non-blank lines."""
+    stripped = (line.strip() for line in text.splitlines())
+    lines = [line for line in stripped if line]
+    ad_lines = sum(1 for line in lines if _AD_RE.search(line))
+    return len(lines), sum(map(len, lines)), ad_lines
+
+
+class MarkdownCounts(NamedTuple):
+    headers: int
+    links: int
+    bold: int
+    italic: int
+    code: int
+
+
+@functools.lru_cache(maxsize=64)
+def _markdown_counts(markdown: str) -> MarkdownCounts:
+    """Header/link/bold/italic/code span counts from one `_RE_ALL` scan."""
+    counts = {'hdr': 0, 'link': 0, 'bold': 0, 'ital': 0, 'code': 0}
+    for match in _RE_ALL.finditer(markdown):
+        counts[match.lastgroup] += 1
+    return MarkdownCounts(
+        counts['hdr'], counts['link'], counts['bold'], counts['ital'], counts['code']
+    )
 
 
 def calculate_quality_metrics(title: Optional[str], text: Optional[str], markdown: Optional[str]) -> Dict[str, any]:
-    """Calculate quality metrics for extracted content."""
+    """Calculate quality metrics for extracted content.
+
+    Methods often return identical text or markdown (e.g. the two
+    Trafilatura variants), so the scans are memoized on content.
+    """
     metrics = {}
 
     # Basic metrics
@@ -233,129 +371,141 @@ def calculate_quality_metrics(title: Optional[str], text: Optional[str], markdow
 
     if text:
         # Count lines and paragraphs
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        metrics['line_count'] = len(lines)
-        metrics['avg_line_length'] = sum(len(line) for line in lines) / len(lines) if lines else 0
+        line_count, total_length, ad_lines = _line_stats(text)
+        metrics['line_count'] = line_count
+        metrics['avg_line_length'] = total_length / line_count if line_count else 0
 
         # Count potential ads/navigation (lines with common ad keywords)
-        ad_keywords = ['advertisement', 'sponsored', 'subscribe', 'newsletter', 'cookie', 'privacy policy', 'terms of service']
-        ad_lines = sum(1 for line in lines if any(keyword.lower() in line.lower() for keyword in ad_keywords))
         metrics['potential_ad_lines'] = ad_lines
-        metrics['ad_ratio'] = ad_lines / len(lines) if lines else 0
+        metrics['ad_ratio'] = ad_lines / line_count if line_count else 0
 
     if markdown:
         # Markdown-specific metrics
-        metrics['markdown_headers'] = len(re.findall(r'^#+\s', markdown, re.MULTILINE))
-        metrics['markdown_links'] = len(re.findall(r'\[.*?\]\(.*?\)', markdown))
-        metrics['markdown_bold'] = len(re.findall(r'\*\*.*?\*\*', markdown))
-        metrics['markdown_italic'] = len(re.findall(r'\*.*?\*', markdown))
-        metrics['markdown_code'] = len(re.findall(r'`.*?`', markdown))
+        counts = _markdown_counts(markdown)
+        metrics['markdown_headers'] = counts.headers
+        metrics['markdown_links'] = counts.links
+        metrics['markdown_bold'] = counts.bold
+        metrics['markdown_italic'] = counts.italic
+        metrics['markdown_code'] = counts.code
 
     return metrics
 
 
-def save_comparison_results(url: str, results: List[Tuple[ExtractionMethod, Tuple, Dict]], output_dir: Path):
+def _add_text_to_tar(archive: tarfile.TarFile, name: str, content: str) -> None:
+    """Add a UTF-8 text member to an open tar archive."""
+    data = content.encode('utf-8')
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    archive.addfile(info, io.BytesIO(data))
+
+
+def save_comparison_results(url: str, results: List[Tuple[str, Tuple, Dict]], output_dir: Path):
     """Save formatted comparison results to files."""
     # Create URL-safe filename
-    import re
-    safe_url = re.sub(r'[^\w\-_.]', '_', url.replace('://', '_').replace('/', '_'))
-    url_dir = output_dir / safe_url
-    url_dir.mkdir(parents=True, exist_ok=True)
+    safe_url = _RE_SAFE.sub('_', url.translate(_TRANS))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # One archive per URL instead of a directory of small files
+    archive_path = output_dir / f"{safe_url}.tar"
+    archive = tarfile.open(archive_path, 'w')
+    member_count = 0
 
     # Create summary report
-    summary_content = []
-    summary_content.append(f"# EXTRACTION COMPARISON RESULTS")
-    summary_content.append(f"**URL:** {url}")
-    summary_content.append(f"**Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    summary_content.append("")
+    summary = io.StringIO()
+    print(f"# EXTRACTION COMPARISON RESULTS", file=summary)
+    print(f"**URL:** {url}", file=summary)
+    print(f"**Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}", file=summary)
+    print(file=summary)
 
     # Summary table
-    summary_content.append("## Summary Table")
-    summary_content.append("")
-    summary_content.append("| Method | Text Length | Lines | Avg Line | Ad Lines | MD Headers | MD Links | Time |")
-    summary_content.append("|--------|-------------|-------|----------|----------|------------|----------|------|")
+    print("## Summary Table", file=summary)
+    print(file=summary)
+    print("| Method | Text Length | Lines | Avg Line | Ad Lines | MD Headers | MD Links | Time |", file=summary)
+    print("|--------|-------------|-------|----------|----------|------------|----------|------|", file=summary)
 
-    for i, (method, (title, text, markdown), metrics) in enumerate(results):
+    for i, (name, (title, text, markdown), metrics) in enumerate(results):
         if 'error' in metrics:
-            summary_content.append(f"| {method.name} | ERROR | ERROR | ERROR | ERROR | ERROR | ERROR | ERROR |")
+            print(f"| {name} | ERROR | ERROR | ERROR | ERROR | ERROR | ERROR | ERROR |", file=summary)
         else:
-            summary_content.append(f"| {method.name} | {metrics.get('text_length', 0):,} | {metrics.get('line_count', 0)} | {metrics.get('avg_line_length', 0):.1f} | {metrics.get('potential_ad_lines', 0)} | {metrics.get('markdown_headers', 0)} | {metrics.get('markdown_links', 0)} | {metrics.get('extraction_time', 0):.2f}s |")
+            print(f"| {name} | {metrics.get('text_length', 0):,} | {metrics.get('line_count', 0)} | {metrics.get('avg_line_length', 0):.1f} | {metrics.get('potential_ad_lines', 0)} | {metrics.get('markdown_headers', 0)} | {metrics.get('markdown_links', 0)} | {metrics.get('extraction_time', 0):.2f}s |", file=summary)
 
-    summary_content.append("")
+    print(file=summary)
 
     # Detailed results for each method
-    for i, (method, (title, text, markdown), metrics) in enumerate(results):
-        summary_content.append(f"## METHOD {i+1}: {method.name}")
-        summary_content.append("")
+    for i, (name, (title, text, markdown), metrics) in enumerate(results):
+        print(f"## METHOD {i+1}: {name}", file=summary)
+        print(file=summary)
 
         # Title
-        summary_content.append(f"**Title:** {title or 'None'}")
-        summary_content.append("")
+        print(f"**Title:** {title or 'None'}", file=summary)
+        print(file=summary)
 
         # Metrics
         if 'error' in metrics:
-            summary_content.append(f"**Error:** {metrics['error']}")
+            print(f"**Error:** {metrics['error']}", file=summary)
         else:
-            summary_content.append("**Metrics:**")
-            summary_content.append(f"- Text Length: {metrics.get('text_length', 0):,} chars")
-            summary_content.append(f"- Lines: {metrics.get('line_count', 0)}")
-            summary_content.append(f"- Avg Line Length: {metrics.get('avg_line_length', 0):.1f} chars")
-            summary_content.append(f"- Potential Ad Lines: {metrics.get('potential_ad_lines', 0)} ({metrics.get('ad_ratio', 0):.1%})")
-            summary_content.append(f"- MD Headers: {metrics.get('markdown_headers', 0)}")
-            summary_content.append(f"- MD Links: {metrics.get('markdown_links', 0)}")
-            summary_content.append(f"- MD Formatting: {metrics.get('markdown_bold', 0)} bold, {metrics.get('markdown_italic', 0)} italic")
-            summary_content.append(f"- Extraction Time: {metrics.get('extraction_time', 0):.2f}s")
-
-        summary_content.append("")
+            print("**Metrics:**", file=summary)
+            print(f"- Text Length: {metrics.get('text_length', 0):,} chars", file=summary)
+            print(f"- Lines: {metrics.get('line_count', 0)}", file=summary)
+            print(f"- Avg Line Length: {metrics.get('avg_line_length', 0):.1f} chars", file=summary)
+            print(f"- Potential Ad Lines: {metrics.get('potential_ad_lines', 0)} ({metrics.get('ad_ratio', 0):.1%})", file=summary)
+            print(f"- MD Headers: {metrics.get('markdown_headers', 0)}", file=summary)
+            print(f"- MD Links: {metrics.get('markdown_links', 0)}", file=summary)
+            print(f"- MD Formatting: {metrics.get('markdown_bold', 0)} bold, {metrics.get('markdown_italic', 0)} italic", file=summary)
+            print(f"- Extraction Time: {metrics.get('extraction_time', 0):.2f}s", file=summary)
+
+        print(file=summary)
 
         # Save full content to individual files
-        method_safe_name = re.sub(r'[^\w\-_.]', '_', method.name)
+        method_safe_name = _METHOD_SAFE[name]
 
         # Save full text
         if text:
-            text_file = url_dir / f"{i+1:02d}_{method_safe_name}_text.txt"
-            text_file.write_text(text, encoding='utf-8')
-            summary_content.append(f"**Full Text:** [📄 {text_file.name}]({text_file.name})")
+            text_name = f"{i+1:02d}_{method_safe_name}_text.txt"
+            _add_text_to_tar(archive, text_name, text)
+            member_count += 1
+            print(f"**Full Text:** [📄 {text_name}]({text_name})", file=summary)
         else:
-            summary_content.append("**Full Text:** None")
+            print("**Full Text:** None", file=summary)
 
         # Save full markdown
         if markdown:
-            md_file = url_dir / f"{i+1:02d}_{method_safe_name}_markdown.md"
-            md_file.write_text(markdown, encoding='utf-8')
-            summary_content.append(f"**Full Markdown:** [📝 {md_file.name}]({md_file.name})")
+            md_name = f"{i+1:02d}_{method_safe_name}_markdown.md"
+            _add_text_to_tar(archive, md_name, markdown)
+            member_count += 1
+            print(f"**Full Markdown:** [📝 {md_name}]({md_name})", file=summary)
         else:
-            summary_content.append("**Full Markdown:** None")
+            print("**Full Markdown:** None", file=summary)
 
         # Content previews in summary
-        summary_content.append("")
-        summary_content.append("**Text Preview (first 500 chars):**")
+        print(file=summary)
+        print("**Text Preview (first 500 chars):**", file=summary)
         text_preview = text[:500] + "..." if text and len(text) > 500 else (text or "None")
-        summary_content.append("```")
-        summary_content.append(text_preview)
-        summary_content.append("```")
-        summary_content.append("")
+        print("```", file=summary)
+        print(text_preview, file=summary)
+        print("```", file=summary)
+        print(file=summary)
 
-        summary_content.append("**Markdown Preview (first 500 chars):**")
+        print("**Markdown Preview (first 500 chars):**", file=summary)
         md_preview = markdown[:500] + "..." if markdown and len(markdown) > 500 else (markdown or "None")
-        summary_content.append("```markdown")
-        summary_content.append(md_preview)
-        summary_content.append("```")
-        summary_content.append("")
-        summary_content.append("---")
-        summary_content.append("")
+        print("```markdown", file=summary)
+        print(md_preview, file=summary)
+        print("```", file=summary)
+        print(file=summary)
+        print("---", file=summary)
+        print(file=summary)
 
     # Save summary report
-    summary_file = url_dir / "00_SUMMARY.md"
-    summary_file.write_text("\n".join(summary_content), encoding='utf-8')
+    _add_text_to_tar(archive, "00_SUMMARY.md", summary.getvalue())
+    archive.close()
 
     # Print console output for immediate feedback
-    print(f"\n✅ Results saved to: {url_dir}")
-    print(f"📋 Summary report: {summary_file}")
-    print(f"📁 Individual files: {len([f for f in url_dir.glob('*') if f.name != '00_SUMMARY.md'])} files")
+    print(f"\n✅ Results saved to: {archive_path}")
+    print(f"📋 Summary report: 00_SUMMARY.md (extract with: tar -xf {archive_path.name})")
+    print(f"📁 Individual files: {member_count} files")
 
 
-def print_comparison_results(url: str, results: List[Tuple[ExtractionMethod, Tuple, Dict]]):
+def print_comparison_results(url: str, results: List[Tuple[str, Tuple, Dict]]):
     """Print formatted comparison results to console (shortened version)."""
     print(f"\n{'='*80}")
     print(f"EXTRACTION COMPARISON RESULTS")
@@ -366,19 +516,94 @@ def print_comparison_results(url: str, results: List[Tuple[ExtractionMethod, Tup
     print(f"\n{'Method':<25} {'Text Length':<12} {'MD Links':<10} {'Time':<8}")
     print(f"{'-'*25} {'-'*12} {'-'*10} {'-'*8}")
 
-    for method, (title, text, markdown), metrics in results:
+    for name, (title, text, markdown), metrics in results:
         if 'error' in metrics:
-            print(f"{method.name:<25} {'ERROR':<12} {'ERROR':<10} {'ERROR':<8}")
+            print(f"{name:<25} {'ERROR':<12} {'ERROR':<10} {'ERROR':<8}")
         else:
             text_len = f"{metrics.get('text_length', 0):,}"[:11]
             md_links = str(metrics.get('markdown_links', 0))
             time_str = f"{metrics.get('extraction_time', 0):.2f}s"
-            print(f"{method.name:<25} {text_len:<12} {md_links:<10} {time_str:<8}")
+            print(f"{name:<25} {text_len:<12} {md_links:<10} {time_str:<8}")
 
     print(f"\n💾 Full results saved to output files (see above)")
     print(f"🔍 Check individual text/markdown files for detailed comparison")
 
 
+async def run_extraction_method(
+    name: str,
+    is_async: bool,
+    fn: Callable[[str], Any],
+    url: str,
+    cache: Optional[shelve.Shelf] = None,
+) -> Tuple[str, Tuple, Dict]:
+    """Run one extraction method on a URL and score its output.
+
+    Outputs are memoized in `cache` (if given) across runs, keyed on the
+    method, the URL and a hash of the page's current HTML.
+    """
+    loop = asyncio.get_running_loop()
+    key = None
+    if cache is not None:
+        try:
+            key = await loop.run_in_executor(_EXECUTOR, _cache_key, name, url)
+        except Exception:
+            key = None  # page unavailable; let the method report its own failure
+
+    if key is not None and key in cache:
+        title, text, markdown, extraction_time = cache[key]
+        metrics = calculate_quality_metrics(title, text, markdown)
+        metrics['extraction_time'] = extraction_time
+        print(f"  ✓ {name}: Cached ({extraction_time:.2f}s when extracted)")
+        return name, (title, text, markdown), metrics
+
+    start_ns = time.perf_counter_ns()
+    try:
+        if is_async:
+            title, text, markdown = await fn(url)
+        else:
+            title, text, markdown = await loop.run_in_executor(_EXECUTOR, fn, url)
+
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+
+        # Calculate metrics
+        metrics = calculate_quality_metrics(title, text, markdown)
+        metrics['extraction_time'] = elapsed
+
+        # Methods swallow their own errors, so only cache real output
+        if key is not None and (text or markdown):
+            cache[key] = (title, text, markdown, metrics['extraction_time'])
+
+        print(f"  ✓ {name}: Success ({metrics['extraction_time']:.2f}s)")
+        return name, (title, text, markdown), metrics
+
+    except Exception as e:
+        print(f"  ✗ {name}: Failed: {e}")
+        return name, (None, None, None), {'error': str(e)}
+
+
+async def process_url(
+    url_idx: int,
+    url_count: int,
+    url: str,
+    output_dir: Path,
+    cache: Optional[shelve.Shelf] = None,
+) -> None:
+    """Run every method on one URL, then save and print its comparison."""
+    print(f"\n{'='*80}")
+    print(f"TESTING URL {url_idx + 1}/{url_count}")
+    print(f"{'='*80}")
+    print(f"URL: {url}")
+
+    print(f"\nTesting {len(METHODS)} methods concurrently...")
+    results = list(await asyncio.gather(
+        *(run_extraction_method(name, is_async, fn, url, cache) for name, is_async, fn in METHODS)
+    ))
+
+    # Save and print comparison for this URL
+    save_comparison_results(url, results, output_dir)
+    print_comparison_results(url, results)
+
+
 async def run_extraction_comparison():
     """Run the extraction comparison test."""
 
@@ -399,56 +624,17 @@ async def run_extraction_comparison():
         "https://en.wikipedia.org/wiki/Web_scraping",
     ]
 
-    # Initialize extraction methods
-    methods = [
-        CurrentMethod(),
-        TrafilaturaEnhanced(favor_precision=True),
-        TrafilaturaEnhanced(favor_precision=False),
-        NewspaperMethod(),
-        ReadabilityMethod(),
-        Html2TextMethod(),
-    ]
-
-    # Test each URL with each method
-    for url_idx, url in enumerate(test_urls):
-        print(f"\n{'='*80}")
-        print(f"TESTING URL {url_idx + 1}/{len(test_urls)}")
-        print(f"{'='*80}")
-        print(f"URL: {url}")
-
-        results = []
-
-        for method_idx, method in enumerate(methods):
-            print(f"\nTesting method {method_idx + 1}/{len(methods)}: {method.name}...")
-
-            start_time = time.time()
-            try:
-                if isinstance(method, CurrentMethod):
-                    title, text, markdown = await method.extract(url)
-                else:
-                    title, text, markdown = method.extract(url)
-
-                end_time = time.time()
-
-                # Calculate metrics
-                metrics = calculate_quality_metrics(title, text, markdown)
-                metrics['extraction_time'] = end_time - start_time
-
-                results.append((method, (title, text, markdown), metrics))
-                print(f"  ✓ Success ({metrics['extraction_time']:.2f}s)")
-
-            except Exception as e:
-                print(f"  ✗ Failed: {e}")
-                results.append((method, (None, None, None), {'error': str(e)}))
+    # Extraction outputs persist across runs; delete the file to force a refresh
+    cache = shelve.open(str(output_dir / ".extraction_cache"))
 
-        # Save and print comparison for this URL
-        save_comparison_results(url, results, output_dir)
-        print_comparison_results(url, results)
+    # Test each URL with each method; the URLs are on different hosts, so
+    # they run concurrently with no delay between them
+    await asyncio.gather(*(
+        process_url(url_idx, len(test_urls), url, output_dir, cache)
+        for url_idx, url in enumerate(test_urls)
+    ))
 
-        # Wait between URLs to be respectful
-        if url_idx < len(test_urls) - 1:
-            print(f"\n\nWaiting 3 seconds before next URL...")
-            await asyncio.sleep(3)
+    cache.close()
 
     print(f"\n{'='*80}")
     print("EXTRACTION COMPARISON COMPLETE")
@@ -108,7 +108,7 @@ CREATE INDEX IF NOT EXISTS idx_items_user_server_status ON items(user_id, server
 CREATE INDEX IF NOT EXISTS idx_items_ts_embedding ON items USING GIN (ts_embedding);
 CREATE INDEX IF NOT EXISTS idx_items_mistral_embedding_ivfflat ON items USING ivfflat (mistral_embedding vector_cosine_ops) WITH (lists = 100);
 CREATE INDEX IF NOT EXISTS idx_item_chunks_ts_embedding ON item_chunks USING GIN (ts_embedding);
-CREATE INDEX IF NOT EXISTS idx_item_chunks_mistral_embedding_ivfflat ON item_chunks USING ivfflat (mistral_embedding vector_l2_ops) WITH (lists = 100);
+CREATE INDEX IF NOT EXISTS idx_item_chunks_mistral_embedding_hnsw ON item_chunks USING hnsw (mistral_embedding vector_l2_ops);
 CREATE INDEX IF NOT EXISTS idx_llm_usage_logs_user_created_at ON llm_usage_logs(user_id, created_at DESC);
 CREATE UNIQUE INDEX IF NOT EXISTS idx_items_user_url_unique ON items(user_id, url);
 CREATE UNIQUE INDEX IF NOT EXISTS idx_items_user_canonical_url ON items(user_id, canonical_url) WHERE canonical_url IS NOT NULL;